@@ -0,0 +1,62 @@
+import threading
+from pyracy.sprite_tools import Animation
+from image_manager import ImageManager
+from sprite_pack import SpritePack
+
+
+class AnimationManager:
+    """
+    Static class to share Animations between everything that uses the same sprite sheet, so each
+    sheet is split into frames only once. Frames baked into the SpritePack aren't split at all.
+    """
+
+    lock = threading.Lock()
+    initialized = False
+    animations = None
+
+    @staticmethod
+    def init():
+        AnimationManager.initialized = True
+        AnimationManager.animations = {}
+
+    @staticmethod
+    def check_initialized():
+        if not AnimationManager.initialized:
+            raise Exception("Must call AnimationManager.init() before any other methods.")
+
+    @staticmethod
+    def clear_all():
+        """
+        Forgets everything
+        """
+        AnimationManager.check_initialized()
+        AnimationManager.animations = {}
+
+    @staticmethod
+    def load(path, sheet_size=(1, 1), frame_count=1, rect=None, reverse_x=False, reverse_y=False,
+             reverse_animation=False, colorkey=None, scale=1.0, start_frame=0):
+        """
+        Loads an Animation from a sprite sheet, or returns the one already made with the same arguments.
+        Takes the same arguments as Animation, with a path instead of a surface.
+        :return: The Animation. Others are using the same one: its frames are a tuple and must not be
+            drawn on.
+        """
+        AnimationManager.check_initialized()
+        key = SpritePack.animation_key(path, sheet_size, frame_count, rect, reverse_x, reverse_y,
+                                       reverse_animation, colorkey, scale, start_frame)
+        with AnimationManager.lock:
+            if key in AnimationManager.animations:
+                return AnimationManager.animations[key]
+            frames = SpritePack.frames(key)
+            if frames is not None:
+                animation = Animation.from_frames(frames, reverse_x=reverse_x, reverse_y=reverse_y,
+                                                  reverse_animation=reverse_animation, colorkey=colorkey,
+                                                  scale=scale)
+            else:
+                animation = Animation(ImageManager.load(path), sheet_size=sheet_size, frame_count=frame_count,
+                                      rect=rect, reverse_x=reverse_x, reverse_y=reverse_y,
+                                      reverse_animation=reverse_animation, colorkey=colorkey, scale=scale,
+                                      start_frame=start_frame)
+            animation.frames = tuple(animation.frames)
+            AnimationManager.animations[key] = animation
+            return animation
@@ -0,0 +1,126 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Must be set before pygame initializes anything in a worker
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import pygame
+
+from image_manager import ImageManager
+from sound_manager import SoundManager
+from sprite_pack import SpritePack
+
+
+def init_worker(mixer_settings):
+    """ Sets a worker process up to decode sounds in the same sample format as the game's mixer """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    if mixer_settings:
+        pygame.mixer.init(*mixer_settings)
+
+
+def decode_image(path):
+    """ :return: path, size, pixel format and pixels of the decoded image """
+    surface = pygame.image.load(path)
+    pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+    return path, surface.get_size(), pixel_format, pygame.image.tobytes(surface, pixel_format)
+
+
+def decode_sound(path):
+    """ :return: path, raw samples of the decoded sound and how long decoding took """
+    start = time.perf_counter()
+    sound = pygame.mixer.Sound(path)
+    return path, sound.get_raw(), time.perf_counter() - start
+
+
+class AssetLoader:
+    """
+    Decodes images and sounds in a pool of processes, and hands the raw pixels and samples back to
+    be wrapped as Surfaces and Sounds and cached in ImageManager and SoundManager. Anything already
+    cached, or baked into the SpritePack, is skipped.
+
+    Starting the pool costs more than decoding a screenful of images, so submit the assets early
+    and collect them later. The pool starts up and decodes while the game shows something else.
+    """
+
+    def __init__(self, workers=None):
+        """
+        :param workers: Number of processes. None uses one per core but one, which is left to the
+            game. With one, everything is decoded in the process that collects it instead.
+        """
+        self.workers = max(1, (os.cpu_count() or 1) - 1) if workers is None else workers
+        self.pool = None
+        # What was submitted to be loaded in this process, or to the pool, and not collected yet
+        self.images = {}
+        self.sounds = []
+        # Colorkeys of each image being decoded in the pool, by its future
+        self.image_futures = {}
+        self.sound_futures = []
+
+    def load(self, images=(), sounds=()):
+        """
+        Decodes images and sounds in this process, for what's needed straight away
+        :param images: (path, colorkey) of each image, as passed to ImageManager.load
+        :param sounds: Path of each sound, as passed to SoundManager.load
+        """
+        for path, colorkey in images:
+            ImageManager.load(path, colorkey=colorkey)
+        for path in sounds:
+            SoundManager.load(path)
+
+    def submit(self, images=(), sounds=()):
+        """
+        Starts decoding images and sounds in the pool, and returns without waiting for them. Call
+        collect, from any one thread, to cache them.
+        :param images: (path, colorkey) of each image, as passed to ImageManager.load
+        :param sounds: Path of each sound, as passed to SoundManager.load
+        """
+        colorkeys = {}
+        for path, colorkey in images:
+            if (path, colorkey) not in ImageManager.images and not SpritePack.has_image(path):
+                colorkeys.setdefault(path, []).append(colorkey)
+        sounds = [path for path in dict.fromkeys(sounds) if path not in SoundManager.sounds]
+        # Reading cached samples is quicker than sending them back from a worker
+        cached = [path for path in sounds if SoundManager.is_cached(path)]
+        sounds = [path for path in sounds if path not in cached]
+        self.sounds += cached
+
+        if self.workers <= 1:
+            for path in colorkeys:
+                self.images.setdefault(path, []).extend(colorkeys[path])
+            self.sounds += sounds
+            return
+
+        if self.pool is None:
+            # Spawned rather than forked, so workers don't inherit the game's display and audio device
+            context = multiprocessing.get_context("spawn")
+            self.pool = ProcessPoolExecutor(self.workers, context, init_worker, (pygame.mixer.get_init(),))
+        for path in colorkeys:
+            self.image_futures[self.pool.submit(decode_image, path)] = colorkeys[path]
+        self.sound_futures += [self.pool.submit(decode_sound, path) for path in sounds]
+
+    def collect(self):
+        """ Waits for everything submitted to be decoded, caches it, and stops the pool """
+        images, self.images = self.images, {}
+        sounds, self.sounds = self.sounds, []
+        image_futures, self.image_futures = self.image_futures, {}
+        sound_futures, self.sound_futures = self.sound_futures, []
+        for path in images:
+            for colorkey in images[path]:
+                ImageManager.load(path, colorkey=colorkey)
+        for path in sounds:
+            SoundManager.load(path)
+
+        for future in as_completed(list(image_futures) + sound_futures):
+            if future in image_futures:
+                path, size, pixel_format, pixels = future.result()
+                for colorkey in image_futures[future]:
+                    ImageManager.add(path, pygame.image.frombytes(pixels, size, pixel_format), colorkey)
+            else:
+                path, samples, decode_time = future.result()
+                SoundManager.add(path, pygame.mixer.Sound(buffer=samples), decode_time)
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,144 @@
+import threading
+import constants as c
+from image_manager import ImageManager
+from sound_manager import SoundManager
+from animation_manager import AnimationManager
+from player import WEAPONS, STARTING_WEAPON
+
+MAGENTA = (255, 0, 255)
+WHITE = (255, 255, 255)
+
+# Images needed before the game frame: the reticle, the title and the instructions
+STARTUP_IMAGES = [
+    ("assets/images/reticle.png", None),
+    ("assets/images/new_title.png", None),
+    ("assets/images/Instructions.png", None),
+]
+
+# Every image the game frame loads whole, as (path, colorkey). Colorkeys must match the ones passed
+# to ImageManager.load where the image is used, or it will be loaded again.
+IMAGES = [
+    # Background
+    ("assets/images/background.png", None),
+    ("assets/images/distant_background.png", None),
+    *[(f"assets/images/cloud {num}.png", None) for num in range(1, 10)],
+    # Player
+    *[(f"assets/images/{mode}.png", MAGENTA) for mode in c.VALID_MODES],
+    # Particles
+    ("assets/images/puff.png", None),
+    ("assets/images/muzzle_flash.png", MAGENTA),
+    ("assets/images/casing.png", None),
+    # Health bars
+    ("assets/images/boss_bar.png", None),
+    ("assets/images/boss_hp.png", MAGENTA),
+    ("assets/images/boss_hp_blink.png", None),
+    ("assets/images/boss_hand_hp_left.png", WHITE),
+    ("assets/images/boss_hand_hp_left_blink.png", MAGENTA),
+    ("assets/images/boss bar hands.png", None),
+    ("assets/images/hp_bar_front.png", MAGENTA),
+    ("assets/images/hp_bar_back.png", None),
+    ("assets/images/hp_bar_front_low.png", None),
+    # End screens
+    ("assets/images/thanks.png", None),
+    ("assets/images/youdied.png", None),
+]
+
+
+def both_ways(path, sheet_size, frame_count, **kwargs):
+    """ An animation facing right and its mirror image """
+    return [(path, dict(sheet_size=sheet_size, frame_count=frame_count, reverse_x=reverse_x, **kwargs))
+            for reverse_x in (False, True)]
+
+
+# Every animation the game frame makes, as (path, AnimationManager.load arguments). They must be the
+# same arguments as where the animation is used, or it will be split again.
+ANIMATIONS = [
+    # Player
+    *both_ways("assets/images/walk_right.png", (8, 1), 8),
+    *both_ways("assets/images/forward_idle.png", (8, 1), 8),
+    *both_ways("assets/images/walk_right_back.png", (8, 1), 8),
+    ("assets/images/roll.png", dict(sheet_size=(6, 1), frame_count=6)),
+    ("assets/images/player death.png", dict(sheet_size=(10, 1), frame_count=10)),
+    *both_ways("assets/images/player_take_damage.png", (6, 1), 3),
+    ("assets/images/stam wheel.png", dict(sheet_size=(16, 1), frame_count=15)),
+    ("assets/images/stam wheel.png", dict(sheet_size=(16, 1), frame_count=1)),
+    # Enemies
+    *both_ways("assets/images/bug.png", (5, 1), 5),
+    *both_ways("assets/images/bug_dying.png", (4, 1), 4),
+    *both_ways("assets/images/bug_dying.png", (4, 1), 2),
+    ("assets/images/boss_idle.png", dict(sheet_size=(3, 1), frame_count=3)),
+    ("assets/images/boss attack.png", dict(sheet_size=(3, 1), frame_count=3)),
+    ("assets/images/laser_mouth.png", dict(sheet_size=(19, 1), frame_count=15)),
+    ("assets/images/laser_mouth.png", dict(sheet_size=(19, 1), frame_count=19, start_frame=15)),
+    ("assets/images/laser.png", dict(sheet_size=(2, 1), frame_count=2)),
+    *both_ways("assets/images/boss hand idle.png", (2, 1), 2),
+    *both_ways("assets/images/boss palm.png", (2, 1), 2),
+    *both_ways("assets/images/boss fist.png", (2, 1), 2),
+    # Projectiles
+    ("assets/images/bullet.png", dict(sheet_size=(3, 1), frame_count=3)),
+    ("assets/images/bread.png", dict(sheet_size=(7, 1), frame_count=1)),
+    ("assets/images/shuriken.png", dict(sheet_size=(1, 1), frame_count=1)),
+    # The weapon the player starts with
+    *WEAPONS[STARTING_WEAPON].animations(),
+]
+
+# The player's weapons' animations and sounds, from the weapons themselves. Player loads each weapon
+# the first time it's used, so only the one it starts with is loaded with the rest. They're all
+# baked into the sprite pack.
+WEAPON_ANIMATIONS = [animation for weapon in WEAPONS.values() for animation in weapon.animations()]
+WEAPON_SOUNDS = list(dict.fromkeys(path for weapon in WEAPONS.values() for path in weapon.sounds))
+
+# Every sound effect the game frame loads through SoundManager
+SOUNDS = [
+    "assets/sounds/Player-Death.mp3",
+    "assets/sounds/Taking-Damage.ogg",
+    "assets/sounds/die_roll.mp3",
+    *[f"assets/sounds/Footstep-{num}.mp3" for num in range(1, 4)],
+    "assets/sounds/Bread-Hits-Object.mp3",
+    "assets/sounds/Enemy-Damage.mp3",
+    "assets/sounds/Boss-Death.mp3",
+    "assets/sounds/Laser-Charge.mp3",
+    "assets/sounds/Laser-Shoot.wav",
+    "assets/sounds/Wing-Buzz.mp3",
+    *dict.fromkeys(WEAPONS[STARTING_WEAPON].sounds),
+]
+
+
+class AssetPrefetcher:
+    """
+    Loads everything in the manifest into ImageManager, AnimationManager and SoundManager on a
+    worker thread, so it's already in memory when the game frame asks for it.
+    """
+
+    def __init__(self, images=None, animations=None, sounds=None, loader=None):
+        """
+        :param loader: An AssetLoader the manifest was submitted to. What it decoded is collected
+            first, and whatever it skipped is loaded here.
+        """
+        self.loader = loader
+        self.images = IMAGES if images is None else images
+        self.animations = ANIMATIONS if animations is None else animations
+        self.sounds = SOUNDS if sounds is None else sounds
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.error = None
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        try:
+            if self.loader is not None:
+                self.loader.collect()
+            for path, colorkey in self.images:
+                ImageManager.load(path, colorkey=colorkey)
+            for path, kwargs in self.animations:
+                AnimationManager.load(path, **kwargs)
+            for path in self.sounds:
+                SoundManager.load(path)
+        except Exception as e:
+            # Whatever didn't load will be loaded again, and fail visibly, when it's used
+            self.error = e
+            print(f"Error prefetching assets: {e}")
+
+    def done(self):
+        return not self.thread.is_alive()
@@ -1,61 +1,97 @@
 import pygame
 import math
-from camera import Camera
 import constants as c
-from primitives import Pose
 import random
+from image_manager import ImageManager
+from variant_cache import VariantCache
 
 
-class Cloud:
+class CloudLayer:
+    """
+    Clouds drifting left across the screen behind the arena. One cloud starts at the right edge
+    every period seconds, with an image and height picked from its number alone, so where every
+    cloud is follows from the time without simulating anything.
+    """
 
-    def __init__(self, surf, position=(0, 0)):
-        self.surf = surf
-        self.position = Pose(position)
-        self.velocity = Pose((-20, 0))
+    def __init__(self, images, period=5, speed=20, x_limit=500, time=0, seed=None):
+        """
+        :param images: Scaled cloud surfaces, with their colorkey and alpha already set
+        :param period: Seconds between clouds
+        :param speed: Pixels per second the clouds move left
+        :param x_limit: How far left of the screen a cloud's center goes before it's gone
+        :param time: Seconds the layer has already been running
+        :param seed: Picks the clouds' images and heights. None picks one at random.
+        """
+        self.images = images
+        self.period = period
+        self.speed = speed
+        self.x_limit = x_limit
+        self.time = time
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.placements = {}
 
-    def update(self, dt, events):
-        self.position += self.velocity*dt
-
-    def draw(self, surface, offset=(0, 0)):
-        w = self.surf.get_width()
-        h = self.surf.get_height()
-        x = self.position.x - offset[0] - w//2
-        y = self.position.y - offset[1] - h//2
+    def placement(self, index):
+        """ :return: Image and screen height of the center of the index'th cloud """
+        if index not in self.placements:
+            rng = random.Random(self.seed * 1000003 + index)
+            self.placements[index] = rng.choice(self.images), rng.random() * c.WINDOW_HEIGHT
+        return self.placements[index]
 
-        if x < -w or x > c.WINDOW_WIDTH:
-            return
-        if y < -h or y > c.WINDOW_HEIGHT:
-            return
+    def update(self, dt, events):
+        self.time += dt
 
-        in_world = Camera.screen_to_world(self.position.get_position())
-        if w//2 < in_world.x < c.ARENA_WIDTH - w//2:
-            if h//2 < in_world.y < c.ARENA_HEIGHT - h//2:
-                return
+    def draw(self, surface, hidden=None):
+        """
+        :param hidden: Screen rect covered by something drawn later. Clouds entirely inside it are skipped.
+        """
+        # Cloud index started at index * period, and is gone once it's crossed the screen
+        lifetime = (c.WINDOW_WIDTH + self.x_limit) / self.speed
+        first = max(1, math.ceil((self.time - lifetime) / self.period))
+        last = math.floor(self.time / self.period)
+        for index in [index for index in self.placements if index < first]:
+            del self.placements[index]
 
-        surface.blit(self.surf, (x, y))
+        for index in range(first, last + 1):
+            image, y = self.placement(index)
+            w, h = image.get_size()
+            x = c.WINDOW_WIDTH - self.speed * (self.time - index * self.period)
+            rect = pygame.Rect(x - w//2, y - h//2, w, h)
+            if hidden and hidden.contains(rect):
+                continue
+            surface.blit(image, rect)
 
 
 class Background:
 
-    def __init__(self):
-        surf = pygame.image.load("assets/images/background.png")
-        self.background_background = pygame.image.load("assets/images/distant_background.png")
+    def __init__(self, precomposed=True):
+        """
+        :param precomposed: Whether to draw the arena from one surface made up front, rather than
+            from 200x200 tiles
+        """
+        surf = ImageManager.load("assets/images/background.png")
+        self.background_background = ImageManager.load("assets/images/distant_background.png")
         self.tile_size = (200, 200)
-        self.cloud_images = [
-            pygame.image.load(f"assets/images/cloud {num}.png") for num in range(1,10)
-        ]
-        self.clouds = []
 
-        self.since_cloud = 0
-        self.since_cloud_MAX = 5
-        self.clouds_x_limit = 500
         self.scale_adjustment = 0.5
         self.alpha = 100
         self.cloud_color = (255, 0, 195)
+        self.cloud_images = [
+            self.load_cloud(f"assets/images/cloud {num}.png") for num in range(1,10)
+        ]
+        # Starts two minutes in, so the screen already has clouds on it
+        self.clouds = CloudLayer(self.cloud_images, period=5, x_limit=500, time=120)
         tile_size = self.tile_size
         tiles_wide = math.ceil(surf.get_width()/tile_size[0])
         tiles_high = math.ceil(surf.get_height()/tile_size[1])
         self.tiles = []
+        self.arena = None
+        if precomposed:
+            # The same pixels as the tiles, in one surface
+            self.arena = pygame.Surface((tiles_wide * tile_size[0], tiles_high * tile_size[1]))
+            self.arena.fill((255, 0, 255))
+            self.arena.blit(surf, (0, 0))
+            self.arena.set_colorkey((255, 0, 255), pygame.RLEACCEL)
+            tiles_high = 0
         for y in range(tiles_high):
             row = []
             ypix = y * tile_size[1]
@@ -65,15 +101,29 @@ class Background:
                 tile_surf.fill((255, 0, 255))
                 tile_surf.blit(surf, (0, 0), (xpix, ypix, tile_size[0], tile_size[1]))
                 row.append(tile_surf)
-                tile_surf.set_colorkey((255, 0, 255))
+                tile_surf.set_colorkey((255, 0, 255), pygame.RLEACCEL)
             self.tiles.append(row)
-        for i in range(120):
-            self.update(1, [])
+
+    def load_cloud(self, path):
+        def make():
+            image = ImageManager.load(path)
+            image = pygame.transform.scale(image, (image.get_width()*self.scale_adjustment, image.get_height()*self.scale_adjustment))
+            image.set_colorkey(self.cloud_color)
+            image.set_alpha(self.alpha)
+            return image
+        return VariantCache.get("cloud", make, sources=[path], scale=self.scale_adjustment,
+                                colorkey=self.cloud_color, alpha=self.alpha)
 
     def draw(self, surface, offset=(0, 0)):
         surface.blit(self.background_background, (0, 0))
-        for cloud in self.clouds:
-            cloud.draw(surface, (0, 0))
+        # Clouds well inside the arena are covered by it
+        self.clouds.draw(surface, pygame.Rect(-offset[0], -offset[1], c.ARENA_WIDTH, c.ARENA_HEIGHT))
+        if self.arena:
+            # Only the part of the arena under the screen is blitted. Rounded down like the tiles on screen.
+            x = math.floor(-offset[0] - 400)
+            y = math.floor(-offset[1] - 300)
+            surface.blit(self.arena, (0, 0), (-x, -y, surface.get_width(), surface.get_height()))
+            return
         for y, row in enumerate(self.tiles):
             for x, tile_surf in enumerate(row):
                 xpix = x * self.tile_size[0] - offset[0] - 400
@@ -85,15 +135,4 @@ class Background:
                 surface.blit(tile_surf, (xpix, ypix))
 
     def update(self, dt, events):
-        self.since_cloud += dt
-        while self.since_cloud > self.since_cloud_MAX:
-            self.since_cloud -= self.since_cloud_MAX
-            image = random.choice(self.cloud_images)
-            image = pygame.transform.scale(image, (image.get_width()*self.scale_adjustment, image.get_height()*self.scale_adjustment))
-            image.set_colorkey(self.cloud_color)
-            image.set_alpha(self.alpha)
-            self.clouds.append(Cloud(image, (c.WINDOW_WIDTH, random.random() * c.WINDOW_HEIGHT)))
-        for cloud in self.clouds[:]:
-            cloud.update(dt, events)
-            if cloud.position.x < -self.clouds_x_limit:
-                self.clouds.remove(cloud)
+        self.clouds.update(dt, events)
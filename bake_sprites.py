@@ -0,0 +1,113 @@
+import os
+import json
+import zlib
+import hashlib
+import argparse
+
+# Must be set before pygame initializes the display
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import pygame
+
+import constants as c
+from asset_manifest import STARTUP_IMAGES, IMAGES, ANIMATIONS, WEAPON_ANIMATIONS
+from image_manager import ImageManager
+from pyracy.sprite_tools import Animation
+from sprite_pack import SpritePack, MAGIC, HEADER, DATA_START, PIXEL_FORMAT
+
+
+class PackWriter:
+    """
+    Writes surfaces' pixels one after another, storing identical ones only once. Animations that
+    take different frames of the same sheet mostly share their pixels. Pixels that zlib shrinks to
+    less than half are stored compressed.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.offsets = {}
+        file.seek(DATA_START)
+
+    def add(self, surface):
+        """ :return: The index entry of surface """
+        alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+        # The raw pixels rather than tobytes, which would set the unused byte of opaque pixels to
+        # 255. Colorkeys compare it too.
+        pixels = surface.get_buffer().raw
+        digest = hashlib.sha1(pixels).digest()
+        if digest not in self.offsets:
+            compressed = zlib.compress(pixels)
+            stored = len(compressed) if len(compressed) < len(pixels) // 2 else 0
+            self.offsets[digest] = self.file.tell(), stored
+            self.file.write(compressed if stored else pixels)
+        offset, stored = self.offsets[digest]
+        return [offset, surface.get_width(), surface.get_height(), alpha, stored]
+
+
+def load(path):
+    """ Decodes and converts an image the way ImageManager does when there is no pack """
+    surface = ImageManager.convert(pygame.image.load(path))
+    masks = surface.get_masks()
+    if masks[:3] != (0xFF0000, 0xFF00, 0xFF) or surface.get_pitch() != surface.get_width() * 4:
+        raise ValueError(f"{path} converted to an unexpected pixel format {masks}")
+    return surface
+
+
+def bake(output, max_pixels=c.SPRITE_PACK_MAX_PIXELS):
+    """
+    Bakes the images and animations in the asset manifest into a sprite pack at output. Images
+    bigger than max_pixels are left out, and load from their PNG.
+    """
+    pygame.init()
+    # Converting needs a display to know its pixel format
+    pygame.display.set_mode((1, 1))
+
+    animations = ANIMATIONS + WEAPON_ANIMATIONS
+    sheets = {path for path, kwargs in animations}
+    paths = sorted({path for path, colorkey in STARTUP_IMAGES + IMAGES} - sheets)
+    index = {"pixel_format": PIXEL_FORMAT, "images": {}, "animations": {}, "sources": {}}
+    temporary = output + ".tmp"
+    with open(temporary, "wb") as file:
+        writer = PackWriter(file)
+        for path in paths:
+            surface = load(path)
+            if surface.get_width() * surface.get_height() > max_pixels:
+                continue
+            index["sources"][path] = os.path.getmtime(path)
+            index["images"][path] = writer.add(surface)
+
+        surfaces = {}
+        for path, kwargs in animations:
+            if path not in surfaces:
+                surfaces[path] = load(path)
+            index["sources"][path] = os.path.getmtime(path)
+            animation = Animation(surfaces[path], **kwargs)
+            index["animations"][SpritePack.animation_key(path, **kwargs)] = {
+                "path": path,
+                "frames": [writer.add(frame) for frame in animation.frames],
+            }
+
+        index_offset = file.tell()
+        encoded = json.dumps(index).encode()
+        file.write(encoded)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, index_offset, len(encoded)))
+    os.replace(temporary, output)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bakes the game's sprites into a pack it can load without decoding PNGs.")
+    parser.add_argument("--output", default=c.SPRITE_PACK_PATH, help="Where to write the pack")
+    parser.add_argument("--max-pixels", type=int, default=c.SPRITE_PACK_MAX_PIXELS,
+                        help="Leave out images with more pixels than this")
+    args = parser.parse_args()
+
+    index = bake(args.output, args.max_pixels)
+    frames = sum(len(animation["frames"]) for animation in index["animations"].values())
+    print(f"Baked {len(index['images'])} images and {len(index['animations'])} animations "
+          f"({frames} frames) into {args.output}, {os.path.getsize(args.output)/1024/1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import os
+import sys
+import math
+import json
+import time
+import random
+import argparse
+import subprocess
+
+# Keep stdout clean for the JSON report
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+import pygame
+
+import constants as c
+from primitives import Pose
+from camera import Camera
+from controls import Controls, SyntheticInput
+from headless import HeadlessGame
+from enemy import Grunt
+from particle import Casing
+from sound_manager import SoundManager
+
+
+class Scenario:
+    """
+    A named, repeatable situation to time. setup is called once on a freshly loaded GameFrame;
+    tick is called before every update to keep the situation going (refill enemies, hold the
+    trigger, keep the player alive...).
+    """
+
+    def __init__(self, name, setup, tick=None, description=""):
+        self.name = name
+        self.setup = setup
+        self.tick = tick
+        self.description = description
+
+
+def keep_player_alive(frame):
+    frame.player.since_damage = 0
+    frame.player.health = frame.player.max_health
+
+
+def aim_at(controls, position):
+    controls.mouse_pos = Camera.world_to_screen(position.get_position()).get_position()
+
+
+def grunts_in(frame):
+    return [enemy for enemy in frame.enemies if isinstance(enemy, Grunt) and not enemy.lethal]
+
+
+def fill_grunts(frame, count, distance=700):
+    missing = count - len(grunts_in(frame))
+    for i in range(missing):
+        offset = Pose.polar(distance, (i * 360 / count) - 90)
+        frame.enemies.append(Grunt((frame.player.position + offset).get_position(), frame))
+
+
+# Boss laser sweep
+def setup_boss_laser(frame, controls):
+    boss = frame.boss
+    boss.position = frame.player.position + Pose((0, -500))
+    frame.enemies.append(boss)
+    frame.healthbar.visible = True
+    boss.prepare_laser_attack()
+
+
+def tick_boss_laser(frame, controls):
+    keep_player_alive(frame)
+    if frame.boss.boss_mode not in (c.BOSS_PREPARING_LASER, c.BOSS_FIRING_LASER):
+        frame.boss.prepare_laser_attack()
+    aim_at(controls, frame.boss.position)
+
+
+# Gatling into 15 grunts
+def setup_gatling(frame, controls):
+    frame.enemies = []
+    frame.player.switch_weapon(c.GATLING)
+    controls.mouse_buttons[0] = True
+    fill_grunts(frame, 15)
+
+
+def tick_gatling(frame, controls):
+    keep_player_alive(frame)
+    frame.player.switch_weapon(c.GATLING)
+    fill_grunts(frame, 15)
+    grunts = grunts_in(frame)
+    if grunts:
+        aim_at(controls, grunts[0].position)
+
+
+# Shuriken fan spam
+def setup_shuriken(frame, controls):
+    frame.enemies = []
+    frame.player.switch_weapon(c.SHURIKEN)
+    controls.mouse_buttons[0] = True
+
+
+def tick_shuriken(frame, controls):
+    keep_player_alive(frame)
+    player = frame.player
+    player.switch_weapon(c.SHURIKEN)
+    # Ignore the cooldown and throw a fan every 0.1s
+    if player.last_fire >= c.COOLDOWNS[c.GATLING]:
+        player.last_fire = c.COOLDOWNS[c.SHURIKEN]
+        player.firing = False
+    aim_at(controls, player.position + Pose.polar(300, player.last_fire * 3600))
+
+
+# Horde of 200 grunts
+def setup_horde(frame, controls):
+    frame.enemies = []
+    fill_grunts(frame, 200, distance=900)
+
+
+def tick_horde(frame, controls):
+    keep_player_alive(frame)
+    fill_grunts(frame, 200, distance=900)
+
+
+# 200 casings on the floor
+def setup_casings(frame, controls):
+    frame.enemies = []
+    for i in range(200):
+        offset = Pose.polar(50 + i * 2, i * 37)
+        frame.particles.append(Casing((frame.player.position + offset).get_position(), duration=999))
+
+
+def tick_casings(frame, controls):
+    keep_player_alive(frame)
+
+
+SCENARIOS = {
+    scenario.name: scenario for scenario in [
+        Scenario("boss_laser_sweep", setup_boss_laser, tick_boss_laser,
+                 "Boss repeatedly charging and sweeping its laser across the screen"),
+        Scenario("gatling_15_grunts", setup_gatling, tick_gatling,
+                 "Gatling held down into a ring of 15 grunts that is kept topped up"),
+        Scenario("shuriken_fan_spam", setup_shuriken, tick_shuriken,
+                 "A five shuriken fan thrown every 0.1s while spinning the aim"),
+        Scenario("casings_200", setup_casings, tick_casings,
+                 "200 bullet casings lying around the player"),
+        Scenario("horde_200_grunts", setup_horde, tick_horde,
+                 "200 grunts crowding in on the player, refilled as they die"),
+    ]
+}
+
+
+def percentile(values, p):
+    """ Nearest-rank percentile of a list of numbers """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "max": max(values) if values else 0.0,
+    }
+
+
+def run_scenario(game, scenario, ticks, warmup, dt, seed=0):
+    random.seed(seed)
+    controls = SyntheticInput()
+    game.input = controls
+    Controls.init(controls)
+    game.tutorial = True  # Keep the boss from entering on its own
+    frame = game.load()
+    scenario.setup(frame, controls)
+
+    update_ms = []
+    draw_ms = []
+    counts = {"enemies": [], "projectiles": [], "particles": []}
+    for i in range(warmup + ticks):
+        if scenario.tick:
+            scenario.tick(game.frame, controls)
+
+        start = time.perf_counter()
+        game.step(dt)
+        updated = time.perf_counter()
+        game.frame.draw(game.target, (0, 0))
+        game.target.present()
+        drawn = time.perf_counter()
+
+        if i < warmup:
+            continue
+        update_ms.append((updated - start) * 1000)
+        draw_ms.append((drawn - updated) * 1000)
+        counts["enemies"].append(len(game.frame.enemies))
+        counts["projectiles"].append(len(game.frame.projectiles))
+        counts["particles"].append(len(game.frame.particles))
+
+    return {
+        "description": scenario.description,
+        "ticks": ticks,
+        "update_ms": summarize(update_ms),
+        "draw_ms": summarize(draw_ms),
+        "counts": {key: {"mean": sum(values) / len(values), "max": max(values)} for key, values in counts.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time GameFrame update and draw in named scenarios.")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all). Choices: {', '.join(SCENARIOS)}")
+    parser.add_argument("--ticks", type=int, default=600, help="measured ticks per scenario")
+    parser.add_argument("--warmup", type=int, default=60, help="unmeasured ticks run before measuring")
+    parser.add_argument("--dt", type=float, default=1/c.FRAMERATE, help="simulated seconds per tick")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random module")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name}")
+
+    game = HeadlessGame(seed=args.seed)
+    report = {
+        "commit": git_commit(),
+        "pygame": pygame.version.ver,
+        "dt": args.dt,
+        "seed": args.seed,
+        "scenarios": {},
+    }
+    for name in names:
+        report["scenarios"][name] = run_scenario(game, SCENARIOS[name], args.ticks, args.warmup, args.dt, args.seed)
+    report["sound_cache"] = SoundManager.stats()
+    report["sound_decode_ms"] = {path: round(seconds * 1000, 3) for path, seconds in SoundManager.decode_report()}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
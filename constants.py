@@ -11,6 +11,51 @@ ARENA_SIZE = ARENA_WIDTH, ARENA_HEIGHT
 
 FRAMERATE = 60
 
+# Size frames are rendered at relative to the window, like 0.5 for 960x540. They are scaled up to
+# the window, smoothly or keeping pixels square.
+RENDER_SCALE = 1
+RENDER_SMOOTH_UPSCALE = False
+
+# Bytes of decoded images ImageManager keeps before forgetting the least recently used ones
+IMAGE_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Pre-split sprites made by bake_sprites.py. The game loads PNGs as usual if it's missing
+SPRITE_PACK_PATH = "assets/sprites.pack"
+# Images with more pixels than this, like full screen ones, stay out of the pack. Their raw pixels
+# would take many times the space of the PNG, for images loaded once or twice.
+SPRITE_PACK_MAX_PIXELS = WINDOW_WIDTH * WINDOW_HEIGHT // 4
+
+# Where VariantCache keeps scaled, flipped and drawn surfaces between sessions
+VARIANT_CACHE_DIRECTORY = "cache/variants"
+
+# Where SoundManager keeps decoded samples between sessions
+SOUND_CACHE_DIRECTORY = "cache/sounds"
+
+# Bytes of decoded samples SoundManager keeps before forgetting the least recently used ones
+SOUND_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Mixer channels VoiceManager shares between sounds
+MIXER_CHANNELS = 32
+
+# Background music, streamed by Music
+INTRO_MUSIC_PATH = "assets/sounds/Music-Intro.mp3"
+MAIN_MUSIC_PATH = "assets/sounds/Music-Main-Loop.mp3"
+MUSIC_VOLUME = 0.4
+MUSIC_FADE_MS = 800
+
+# Processes decoding the game frame's assets while the first screens show. None uses one per core
+# but one, which is left to the game. With one, they're decoded on the prefetch thread instead.
+ASSET_LOADER_WORKERS = None
+
+# Side of the grid cells used to find nearby objects in collision checks
+COLLISION_CELL_SIZE = 200
+
+# Draw the arena floor from one surface composed at load, instead of tile by tile
+PRECOMPOSED_BACKGROUND = True
+
+# Angle buckets, in degrees, for sprites that cache their rotated frames
+ROTATION_CACHE_STEP = 2
+
 WALKING = 0
 IDLE = 1
 ROLLING = 2
@@ -41,6 +86,17 @@ VALID_MODES = (GUN,BREAD,SHURIKEN,FIRE,GATLING,KNIFE)
 BACKGROUND = 0
 FOREGROUND = 1
 
+# Layers of the render queue, drawn from the first up. Actors are queued in depth order.
+CORPSE_LAYER = 0
+GROUND_PARTICLE_LAYER = 1
+GROUND_LAYER = 2
+ACTOR_LAYER = 3
+AIR_LAYER = 4
+PLAYER_LAYER = 5
+AIR_PARTICLE_LAYER = 6
+RENDER_LAYERS = 7
+PARTICLE_LAYERS = {BACKGROUND: GROUND_PARTICLE_LAYER, FOREGROUND: AIR_PARTICLE_LAYER}
+
 # Player specifications
 MAX_HEALTH = 100
 INITIAL_HEALTH = 100
@@ -0,0 +1,127 @@
+import pygame
+import math
+from camera import Camera
+
+
+class Controls:
+    """
+    Static class that answers "what is the player pressing?" for the rest of the game.
+    By default it reads straight from pygame; a synthetic source can be swapped in to drive the
+    game without a keyboard or mouse (e.g. in headless mode).
+    """
+
+    source = None
+
+    @classmethod
+    def init(cls, source=None):
+        cls.source = source
+
+    @classmethod
+    def get_pressed(cls):
+        if cls.source is None:
+            return pygame.key.get_pressed()
+        return cls.source.get_pressed()
+
+    @classmethod
+    def get_mouse_pressed(cls):
+        if cls.source is None:
+            return pygame.mouse.get_pressed()
+        return cls.source.get_mouse_pressed()
+
+    @classmethod
+    def get_mouse_pos(cls):
+        if cls.source is None:
+            return pygame.mouse.get_pos()
+        return cls.source.get_mouse_pos()
+
+
+class KeyState:
+    """ Stand-in for the sequence returned by pygame.key.get_pressed """
+
+    def __init__(self, held=()):
+        self.held = set(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class SyntheticInput:
+    """
+    Input source that doesn't need a window. Holds whatever keys, buttons and mouse position it is
+    told to, and produces the events for the next tick.
+    """
+
+    def __init__(self):
+        self.held = set()
+        self.mouse_buttons = [False, False, False]
+        self.mouse_pos = (0, 0)
+        self.pending_events = []
+
+    def update(self, dt, frame):
+        """ Advances the input by one tick. Returns the events generated during that tick. """
+        events = self.pending_events
+        self.pending_events = []
+        return events
+
+    def press(self, key):
+        self.pending_events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+    def get_pressed(self):
+        return KeyState(self.held)
+
+    def get_mouse_pressed(self):
+        return tuple(self.mouse_buttons)
+
+    def get_mouse_pos(self):
+        return self.mouse_pos
+
+
+class BotInput(SyntheticInput):
+    """
+    Synthetic input that plays the game on its own: strafes around the arena center, keeps the
+    trigger held, aims at the nearest living enemy and rolls every few seconds to cycle weapons.
+    """
+
+    STRAFE_PERIOD = 4
+    ROLL_PERIOD = 3
+
+    def __init__(self):
+        super().__init__()
+        self.age = 0
+        self.since_roll = 0
+        self.mouse_buttons[0] = True
+
+    def update(self, dt, frame):
+        self.age += dt
+        self.since_roll += dt
+
+        player = frame.player
+        heading = (self.age / self.STRAFE_PERIOD) * 2 * math.pi
+        self.held = set()
+        if math.cos(heading) > 0.3:
+            self.held.add(pygame.K_d)
+        elif math.cos(heading) < -0.3:
+            self.held.add(pygame.K_a)
+        if math.sin(heading) > 0.3:
+            self.held.add(pygame.K_s)
+        elif math.sin(heading) < -0.3:
+            self.held.add(pygame.K_w)
+
+        target = None
+        for enemy in frame.enemies:
+            if enemy.lethal or enemy.destroyed:
+                continue
+            if target is None or enemy.position.distance_to(player.position) < target.position.distance_to(player.position):
+                target = enemy
+        if target is not None:
+            self.mouse_pos = Camera.world_to_screen(target.position.get_position()).get_position()
+        else:
+            self.mouse_pos = Camera.world_to_screen(player.position.get_position()).get_position()
+
+        if self.since_roll > self.ROLL_PERIOD:
+            self.since_roll = 0
+            self.press(pygame.K_SPACE)
+        if player.dead:
+            self.press(pygame.K_r)
+
+        return super().update(dt, frame)
@@ -1,4 +1,4 @@
-from pyracy.sprite_tools import Sprite, Animation
+from pyracy.sprite_tools import Sprite
 from primitives import Pose
 import constants as c
 import math
@@ -6,7 +6,10 @@ import pygame
 from camera import Camera
 import random
 from sound_manager import SoundManager
+from animation_manager import AnimationManager
+from variant_cache import VariantCache
 from particle import Puff
+from voice_manager import VoiceManager
 
 class Enemy:
 
@@ -34,11 +37,10 @@ class Enemy:
         self.since_take_damage = 0
 
         visible_radius = self.shadow_radius()
-        self.shadow = pygame.Surface((visible_radius*2, visible_radius*1.4))
-        self.shadow.fill((255, 255, 0))
-        self.shadow.set_colorkey((255, 255, 0))
-        pygame.draw.ellipse(self.shadow, (0, 0, 0), self.shadow.get_rect())
-        self.shadow.set_alpha(60)
+        # Everything the shadow is drawn from goes into its key, so changing any of it makes it again
+        shadow = dict(size=(int(visible_radius*2), int(visible_radius*1.4)), color=(0, 0, 0),
+                      colorkey=(255, 255, 0), alpha=60)
+        self.shadow = VariantCache.get("shadow", lambda: self.make_shadow(**shadow), **shadow)
 
         try:
             self.damage_sound = SoundManager.load("assets/sounds/Enemy-Damage.mp3")
@@ -49,6 +51,15 @@ class Enemy:
 
         self.raised = False
 
+    @staticmethod
+    def make_shadow(size, color, colorkey, alpha):
+        shadow = pygame.Surface(size)
+        shadow.fill(colorkey)
+        shadow.set_colorkey(colorkey)
+        pygame.draw.ellipse(shadow, color, shadow.get_rect())
+        shadow.set_alpha(alpha)
+        return shadow
+
     def shadow_radius(self):
         return self.radius
 
@@ -67,7 +78,7 @@ class Enemy:
         self.health_recently_lost += amount
         self.since_take_damage = 0
         if amount > 0:
-            self.damage_bread_sound.play()
+            VoiceManager.play(self.damage_bread_sound)
 
     def draw(self, surface, offset=(0, 0)):
         if not self.lethal:
@@ -108,27 +119,27 @@ class Grunt(Enemy):
 
     def __init__(self, position, frame):
         super().__init__(position, frame)
-        buzz_right = Animation.from_path("assets/images/bug.png",
+        buzz_right = AnimationManager.load("assets/images/bug.png",
                                          sheet_size=(5, 1),
                                          frame_count=5,
                                          reverse_x=True)
-        buzz_left = Animation.from_path("assets/images/bug.png",
+        buzz_left = AnimationManager.load("assets/images/bug.png",
                                          sheet_size=(5, 1),
                                          frame_count=5,
                                          reverse_x=False)
-        die_right = Animation.from_path("assets/images/bug_dying.png",
+        die_right = AnimationManager.load("assets/images/bug_dying.png",
                                         sheet_size=(4, 1),
                                         frame_count=4,
                                         reverse_x = False)
-        die_left = Animation.from_path("assets/images/bug_dying.png",
+        die_left = AnimationManager.load("assets/images/bug_dying.png",
                                         sheet_size=(4, 1),
                                         frame_count=4,
                                         reverse_x = True)
-        damage_left = Animation.from_path("assets/images/bug_dying.png",
+        damage_left = AnimationManager.load("assets/images/bug_dying.png",
                                         sheet_size=(4, 1),
                                         frame_count=2,
                                         reverse_x = False)
-        damage_right = Animation.from_path("assets/images/bug_dying.png",
+        damage_right = AnimationManager.load("assets/images/bug_dying.png",
                                         sheet_size=(4, 1),
                                         frame_count=2,
                                         reverse_x = True)
@@ -204,7 +215,7 @@ class Grunt(Enemy):
             self.sprite.start_animation("DieRight")
         else:
             self.sprite.start_animation("DieLeft")
-        self.damage_sound.play()
+        VoiceManager.play(self.damage_sound)
 
     def take_damage(self, amount):
         super().take_damage(amount)
@@ -219,8 +230,8 @@ class Grunt(Enemy):
 class BossMan(Enemy):
     def __init__(self, position, frame):
         super().__init__(position, frame)
-        idle = Animation.from_path("assets/images/boss_idle.png",frame_count=3,sheet_size=(3, 1))
-        attack = Animation.from_path("assets/images/boss attack.png", frame_count=3, sheet_size=(3, 1))
+        idle = AnimationManager.load("assets/images/boss_idle.png",frame_count=3,sheet_size=(3, 1))
+        attack = AnimationManager.load("assets/images/boss attack.png", frame_count=3, sheet_size=(3, 1))
         self.sprite = Sprite(12)
         self.sprite.add_animation({"Idle": idle, "Attack": attack},loop=True)
         self.sprite.start_animation("Idle")
@@ -241,8 +252,8 @@ class BossMan(Enemy):
             self.death_sound = None
 
         self.beam_sprite = Sprite(12)
-        charging = Animation.from_path("assets/images/laser_mouth.png", sheet_size=(19, 1), frame_count=15)
-        firing = Animation.from_path("assets/images/laser_mouth.png", sheet_size=(19, 1), frame_count=19, start_frame=15)
+        charging = AnimationManager.load("assets/images/laser_mouth.png", sheet_size=(19, 1), frame_count=15)
+        firing = AnimationManager.load("assets/images/laser_mouth.png", sheet_size=(19, 1), frame_count=19, start_frame=15)
         self.beam_sprite.add_animation({
             "Charging": charging,
         })
@@ -253,7 +264,7 @@ class BossMan(Enemy):
         self.beam_sprite.start_animation("Firing")
         self.beam_sprite.add_callback("Charging", self.laser_attack_start)
         self.beam_length_sprite = Sprite(12)
-        beam = Animation.from_path("assets/images/laser.png", sheet_size=(2, 1), frame_count=2)
+        beam = AnimationManager.load("assets/images/laser.png", sheet_size=(2, 1), frame_count=2)
         self.beam_length_sprite.add_animation({"Beam": beam}, loop=True, fps_override=12)
         self.beam_length_sprite.start_animation("Beam")
 
@@ -315,7 +326,7 @@ class BossMan(Enemy):
         self.frame.shake(amt=40)
         self.set_damaging(True)
         self.since_laser_noise = 999
-        self.laser_shoot_sound.play(-1)
+        VoiceManager.play(self.laser_shoot_sound, -1)
 
 
     def set_damaging(self, boolean):
@@ -331,7 +342,7 @@ class BossMan(Enemy):
         self.sweep_direction = c.RIGHT
         self.sweep_target_speed = 500
         self.set_damaging(False)
-        self.laser_charge_sound.play()
+        VoiceManager.play(self.laser_charge_sound)
 
         for hand in self.hands:
             hand.sprite.start_animation("Fist")
@@ -353,7 +364,7 @@ class BossMan(Enemy):
             hand.sprite.start_animation("Idle")
 
         if play_sound:
-            self.buzz_sound.play()
+            VoiceManager.play(self.buzz_sound)
 
     def difficulty(self):
         total_health = self.health + self.hands[0].health + self.hands[1].health
@@ -399,7 +410,7 @@ class BossMan(Enemy):
 
     def destroy(self):
         super().destroy()
-        self.death_sound.play()
+        VoiceManager.play(self.death_sound)
         self.frame.flash(255)
         self.frame.healthbar.visible = False
         self.frame.boss_dead = True
@@ -494,9 +505,11 @@ class BossMan(Enemy):
 class Hand(Enemy):
     def __init__(self, position, frame, right=False):
         super().__init__(position, frame)
-        idle = Animation.from_path("assets/images/boss hand idle.png",sheet_size=(2, 1),frame_count=2, reverse_x=(not right))
-        palm = Animation.from_path("assets/images/boss palm.png", sheet_size=(2, 1), frame_count=2, reverse_x=(not right))
-        fist = Animation.from_path("assets/images/boss fist.png", sheet_size=(2, 1), frame_count=2, reverse_x=(not right))
+        idle = AnimationManager.load("assets/images/boss hand idle.png",sheet_size=(2, 1),frame_count=2, reverse_x=(not right))
+        palm = AnimationManager.load("assets/images/boss palm.png", sheet_size=(2, 1), frame_count=2, reverse_x=(not right))
+        fist = AnimationManager.load("assets/images/boss fist.png", sheet_size=(2, 1), frame_count=2, reverse_x=(not right))
+        for animation in (idle, palm, fist):
+            animation.cache_rotations(c.ROTATION_CACHE_STEP)
         self.sprite = Sprite(12)
         self.sprite.add_animation({
             "Fist":fist,
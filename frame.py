@@ -1,15 +1,21 @@
 from player import Player
 from camera import Camera
 import constants as c
-import pygame
 from background import Background
 from primitives import Pose
 import math
-from particle import SparkParticle
+from particle import SparkParticle, ParticleSystem
 import random
 from healthbar import BossHealthBar
+from asset_manifest import AssetPrefetcher
+from profiler import Profiler
+from spatial import SpatialHash, overlapping_pairs, segment_hit_time
 
 from enemy import Grunt, BossMan
+from voice_manager import VoiceManager
+from music import Music
+from overlay import Overlay
+from render_queue import RenderQueue
 
 class Frame:
     def __init__(self):
@@ -36,11 +42,11 @@ class Instructions(Frame):
         self.age = 0
 
     def load(self):
-        self.title_pannel = pygame.image.load("assets/images/new_title.png")
-        self.instructions = pygame.image.load("assets/images/Instructions.png")
-        self.shade = pygame.Surface(c.WINDOW_SIZE)
-        self.shade.fill((0, 0, 0))
+        self.overlay = Overlay()
         self.shade_alpha = 255
+        # Load the game frame's assets while the player reads the instructions
+        self.prefetcher = AssetPrefetcher(loader=self.game.asset_loader)
+        self.prefetcher.start()
 
     # Handles removal of used objects i.e. bullets shot
     def update(self, dt, events):
@@ -52,7 +58,7 @@ class Instructions(Frame):
             if self.shade_alpha < 0:
                 self.shade_alpha = 0
             self.shade_alpha += 1000*dt
-        if self.age > 7:
+        if self.age > 7 and self.prefetcher.done():
             self.done = True
 
     def next_frame(self):
@@ -60,18 +66,27 @@ class Instructions(Frame):
 
     def draw(self, surface, offset=(0, 0)):
         if self.show_title:
-            self.title_pannel = pygame.transform.scale(self.title_pannel, surface.get_size())
-            surface.blit(self.title_pannel, (0, 0))
+            surface.blit(self.overlay.image("assets/images/new_title.png", surface.get_size()), (0, 0))
         else:
-            self.instructions = pygame.transform.scale(self.instructions, surface.get_size())
-            surface.blit(self.instructions, (0, 0))
-            self.shade.set_alpha(self.shade_alpha)
-            surface.blit(self.shade, (0, 0))
+            surface.blit(self.overlay.image("assets/images/Instructions.png", surface.get_size()), (0, 0))
+            self.overlay.add_color((0, 0, 0), self.shade_alpha)
+            self.overlay.draw(surface)
 
 
 
 
 class GameFrame(Frame):
+    # Profiler section each render queue layer is drawn in, in drawing order
+    LAYER_SECTIONS = [
+        (c.CORPSE_LAYER, "player_draw"),
+        (c.GROUND_PARTICLE_LAYER, "particle_draw"),
+        (c.GROUND_LAYER, "projectile_draw"),
+        (c.ACTOR_LAYER, "enemy_draw"),
+        (c.AIR_LAYER, "projectile_draw"),
+        (c.PLAYER_LAYER, "player_draw"),
+        (c.AIR_PARTICLE_LAYER, "particle_draw"),
+    ]
+
     def __init__(self, game):
         super().__init__()
         self.game = game
@@ -81,11 +96,12 @@ class GameFrame(Frame):
         self.enemies = [Grunt((200, c.ARENA_HEIGHT*0.2), self), Grunt((c.ARENA_WIDTH*2, c.ARENA_HEIGHT*0.7), self)]
         self.boss = BossMan((c.WINDOW_WIDTH//2, -2000), self)
         self.healthbar = BossHealthBar(self.boss)
-        self.particles = []
+        self.particles = ParticleSystem()
         self.projectiles = []
-        self.background = Background()
-        self.red_flash = pygame.Surface(c.WINDOW_SIZE)
-        self.red_flash.fill((255, 0, 0))
+        self.projectile_hash = SpatialHash(c.COLLISION_CELL_SIZE)
+        self.render_queue = RenderQueue(c.RENDER_LAYERS)
+        self.background = Background(c.PRECOMPOSED_BACKGROUND)
+        self.overlay = Overlay()
         self.red_flash_alpha = 0
         self.shake_amp = Pose((0, 0))
         self.since_shake = 0
@@ -95,25 +111,15 @@ class GameFrame(Frame):
         self.restarting = False
 
 
-        self.white_flash = pygame.Surface(c.WINDOW_SIZE)
-        self.white_flash.fill((255, 255, 255))
         self.white_flash_alpha = 0
-
-        self.damage_flash = pygame.Surface(c.WINDOW_SIZE)
-        self.damage_flash.fill((255, 255, 255))
         self.damage_flash_alpha = 0
 
         self.boss_dead = False
         self.since_boss_dead = 0
         self.since_player_died = 0
 
-        self.shade = pygame.Surface(c.WINDOW_SIZE)
-        self.shade.fill((0, 0, 0))
         self.shade_alpha = 255
 
-        self.thanks = pygame.image.load("assets/images/thanks.png")
-        self.youdied = pygame.image.load("assets/images/youdied.png")
-
 
     def update(self, dt, events):
 
@@ -129,11 +135,8 @@ class GameFrame(Frame):
             self.enemies.append(self.boss)
             self.healthbar.visible = True
             if not self.game.main_music_started:
-                pygame.mixer.music.load("assets/sounds/Music-Main-Loop.mp3")
-                pygame.mixer.music.play(loops=-1)
-                pygame.mixer.music.set_volume(0.4)
+                Music.play(c.MAIN_MUSIC_PATH, c.MUSIC_VOLUME, fade_ms=c.MUSIC_FADE_MS)
                 self.game.main_music_started = True
-                self.game.intro_music.fadeout(800)
 
         if not self.restarting:
             self.shade_alpha -= 1000*dt
@@ -156,28 +159,29 @@ class GameFrame(Frame):
         else:
             self.shake_amp = Pose((0, 0))
 
-        for enemy in self.enemies[:]:
-            enemy.update(dt, events)
-            if enemy.destroyed:
-                self.enemies.remove(enemy)
-        self.enemies.sort(key=lambda x:x.position.y)
-
-        keep_particles = []
-        for particle in self.particles:
-            particle.update(dt, events)
-            if not particle.destroyed:
-                keep_particles.append(particle)
-        self.particles = keep_particles
-
-        keep_projectiles = []
-        for projectile in self.projectiles:
-            projectile.update(dt, events)
-            if not projectile.destroyed:
-                keep_projectiles.append(projectile)
-        self.projectiles = keep_projectiles
-
-        self.check_enemy_and_projectile_collisions()
-        self.check_enemy_and_enemy_collisions(dt, events)
+        with Profiler.measure("enemy_update"):
+            for enemy in self.enemies[:]:
+                enemy.update(dt, events)
+                if enemy.destroyed:
+                    self.enemies.remove(enemy)
+            # Enemies are drawn, and hit, in this order. They barely move between ticks, and sort
+            # finds the list already in order in one pass, quicker than keeping it sorted by hand.
+            self.enemies.sort(key=lambda x:x.position.y)
+
+        with Profiler.measure("particle_update"):
+            self.particles.update(dt, events)
+
+        with Profiler.measure("projectile_update"):
+            keep_projectiles = []
+            for projectile in self.projectiles:
+                projectile.update(dt, events)
+                if not projectile.destroyed:
+                    keep_projectiles.append(projectile)
+            self.projectiles = keep_projectiles
+
+        with Profiler.measure("collisions"):
+            self.check_enemy_and_projectile_collisions()
+            self.check_enemy_and_enemy_collisions(dt, events)
 
         self.red_flash_alpha -= 5 * dt
         self.red_flash_alpha *= 0.03**dt
@@ -191,7 +195,7 @@ class GameFrame(Frame):
             for i in range(16):
                 position = self.player.hand_sprite.x, self.player.hand_sprite.y
                 self.particles.append(SparkParticle(position))
-            random.choice(self.player.flame_bursts).play()
+            VoiceManager.play(random.choice(self.player.weapon_sounds[c.FIRE]))
             for enemy in self.enemies:
                 if enemy.lethal or enemy.destroyed:
                     return
@@ -204,25 +208,55 @@ class GameFrame(Frame):
         self.white_flash_alpha = alpha
 
     def check_enemy_and_projectile_collisions(self):
+        if not self.projectiles:
+            return
+        # Bucket projectiles by the middle of the path they moved along this tick, so each enemy only
+        # tests the nearby ones. Candidates come back in list order, so hits happen in the same
+        # order as testing every pair.
+        self.projectile_hash.clear()
+        paths = []
+        max_reach = 0
+        for index, projectile in enumerate(self.projectiles):
+            start_x, start_y = projectile.previous_position.x, projectile.previous_position.y + projectile.previous_z
+            end_x, end_y = projectile.position.x, projectile.position.y + projectile.z
+            step = math.sqrt((end_x - start_x)**2 + (end_y - start_y)**2)
+            paths.append((start_x, start_y, end_x, end_y, step))
+            self.projectile_hash.insert(index, (start_x + end_x)/2, (start_y + end_y)/2)
+            max_reach = max(max_reach, projectile.radius + step/2)
+
         for enemy in self.enemies:
-            for projectile in self.projectiles:
-                projectile_position = projectile.position + Pose((0, projectile.z))
-                if (enemy.position - projectile_position).magnitude() < enemy.radius + projectile.radius:
+            x, y = enemy.position.x, enemy.position.y
+            for index in self.projectile_hash.query(x, y, enemy.radius + max_reach):
+                projectile = self.projectiles[index]
+                start_x, start_y, end_x, end_y, step = paths[index]
+                hit_distance = enemy.radius + projectile.radius
+                dx = x - end_x
+                dy = y - end_y
+                if math.sqrt(dx*dx + dy*dy) < hit_distance:
                     enemy.get_hit_by(projectile)
+                # A projectile that moves less than hit_distance in a tick can't jump over the enemy,
+                # so only test the path of faster ones. One that started the tick overlapping the
+                # enemy already hit it then.
+                elif step >= hit_distance:
+                    through = segment_hit_time(x, y, hit_distance, start_x, start_y, end_x, end_y)
+                    if through is not None and through > 0:
+                        enemy.get_hit_by(projectile)
 
     def check_enemy_and_enemy_collisions(self, dt, events):
-        for i, enemy in enumerate(self.enemies):
-            for j, enemy2 in enumerate(self.enemies):
-                if j <= i:
-                    continue
-                diff = enemy.position - enemy2.position
-                dist = (diff).magnitude()
-                if dist < enemy.radius + enemy2.radius:
-                    overlap_amt = enemy.radius + enemy2.radius - dist
-                    overlap_vec = diff.copy()
-                    overlap_vec.scale_to(overlap_amt * 10)
-                    enemy.velocity += overlap_vec*dt
-                    enemy2.velocity += overlap_vec*-dt
+        # Only pairs whose horizontal extents overlap can touch. They come back in the same order
+        # as a double loop over self.enemies, so velocity changes add up identically.
+        intervals = [(enemy.position.x - enemy.radius, enemy.position.x + enemy.radius) for enemy in self.enemies]
+        for i, j in overlapping_pairs(intervals):
+            enemy = self.enemies[i]
+            enemy2 = self.enemies[j]
+            diff = enemy.position - enemy2.position
+            dist = (diff).magnitude()
+            if dist < enemy.radius + enemy2.radius:
+                overlap_amt = enemy.radius + enemy2.radius - dist
+                overlap_vec = diff.copy()
+                overlap_vec.scale_to(overlap_amt * 10)
+                enemy.velocity += overlap_vec*dt
+                enemy2.velocity += overlap_vec*-dt
 
     def restart(self):
         self.restarting = True
@@ -234,56 +268,57 @@ class GameFrame(Frame):
         offset = Camera.position
         screenshake = Pose((self.shake_amp.x * math.cos(self.since_shake * 35), self.shake_amp.y * math.cos(self.since_shake * 35)))
         offset = (offset + screenshake).get_position()
-        self.background.draw(surface, offset)
-        if self.player.dead:
-            self.player.draw(surface, offset)
-        for particle in self.particles:
-            if particle.layer == c.BACKGROUND:
-                particle.draw(surface, offset=offset)
-        for projectile in self.projectiles:
-            if hasattr(projectile, "landed") and projectile.landed:
-                projectile.draw(surface, offset=offset)
-        for enemy in self.enemies:
-            enemy.draw(surface, offset=offset)
-        for projectile in self.projectiles:
-            if not hasattr(projectile, "landed") or not projectile.landed:
-                projectile.draw(surface, offset=offset)
-        if not self.player.dead:
-            self.player.draw(surface, offset=(offset))
-        for particle in self.particles:
-            if particle.layer == c.FOREGROUND:
-                particle.draw(surface, offset=offset)
-
-        self.healthbar.draw(surface, offset)
+        with Profiler.measure("background_draw"):
+            self.background.draw(surface, offset)
+        queue = self.render_queue
+        with Profiler.measure("player_draw"):
+            queue.set_layer(c.CORPSE_LAYER if self.player.dead else c.PLAYER_LAYER)
+            self.player.draw(queue, offset)
+        with Profiler.measure("particle_draw"):
+            self.particles.draw(queue, offset=offset, layers=c.PARTICLE_LAYERS)
+        with Profiler.measure("projectile_draw"):
+            for projectile in self.projectiles:
+                queue.set_layer(c.GROUND_LAYER if projectile.landed else c.AIR_LAYER)
+                projectile.draw(queue, offset=offset)
+        with Profiler.measure("enemy_draw"):
+            for enemy in self.enemies:
+                queue.set_layer(c.ACTOR_LAYER)
+                enemy.draw(queue, offset=offset)
+        for layer, section in self.LAYER_SECTIONS:
+            with Profiler.measure(section):
+                queue.flush(surface, layer)
+
+        with Profiler.measure("healthbar_draw"):
+            self.healthbar.draw(surface, offset)
 
+        with Profiler.measure("flash_draw"):
+            self.draw_flashes(surface)
+
+    def draw_flashes(self, surface):
         if self.red_flash_alpha > 0:
-            self.red_flash.fill((self.red_flash_alpha, 0.25*self.red_flash_alpha, 0))
-            surface.blit(self.red_flash, (0, 0), special_flags=pygame.BLEND_ADD)
+            self.overlay.add_light((self.red_flash_alpha, 0.25*self.red_flash_alpha, 0))
 
         if self.boss_dead and self.since_boss_dead > 3:
             thanks_alpha = min(((self.since_boss_dead - 3) * 255), 128)
-            self.thanks.set_alpha(thanks_alpha)
-            surface.blit(self.thanks, (0, 0))
+            self.overlay.add_image("assets/images/thanks.png", thanks_alpha)
 
         if self.since_player_died > 0:
             thanks_alpha = min(((self.since_player_died) * 255), 128)
-            self.youdied.set_alpha(thanks_alpha)
-            surface.blit(self.youdied, (0, 0))
+            self.overlay.add_image("assets/images/youdied.png", thanks_alpha)
 
         if self.white_flash_alpha > 0:
-            self.white_flash.set_alpha(self.white_flash_alpha)
-            surface.blit(self.white_flash, (0, 0))
+            self.overlay.add_color((255, 255, 255), self.white_flash_alpha)
             for enemy in self.enemies[:]:
                 if not isinstance(enemy, BossMan):
                     self.enemies.remove(enemy)
 
         if self.damage_flash_alpha > 0:
-            self.damage_flash.set_alpha(self.damage_flash_alpha)
-            surface.blit(self.damage_flash, (0, 0))
+            self.overlay.add_color((255, 255, 255), self.damage_flash_alpha)
 
         if self.shade_alpha > 0:
-            self.shade.set_alpha(self.shade_alpha)
-            surface.blit(self.shade, (0, 0))
+            self.overlay.add_color((0, 0, 0), self.shade_alpha)
+
+        self.overlay.draw(surface)
 
     def shake(self, direction=None, amt=15):
         direction = direction.copy() if direction is not None else Pose((1, -1))
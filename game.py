@@ -4,6 +4,16 @@ from frame import Frame, GameFrame, Instructions
 import sys
 from camera import Camera
 from sound_manager import SoundManager
+from animation_manager import AnimationManager
+from image_manager import ImageManager
+from sprite_pack import SpritePack
+from variant_cache import VariantCache
+from voice_manager import VoiceManager
+from music import Music
+from asset_loader import AssetLoader
+import asset_manifest
+from profiler import Profiler, PerformanceOverlay
+from render_target import RenderTarget
 
 
 class Game:
@@ -13,17 +23,28 @@ class Game:
             self.screen = pygame.display.set_mode(c.WINDOW_SIZE, flags=pygame.FULLSCREEN)
         else:
             self.screen = pygame.display.set_mode(c.WINDOW_SIZE)
+        self.target = RenderTarget(self.screen, c.RENDER_SCALE, c.RENDER_SMOOTH_UPSCALE)
         self.clock = pygame.time.Clock()
-        self.reticle = pygame.image.load("assets/images/reticle.png")
         pygame.mouse.set_visible(False)
         Camera.init()
-        SoundManager.init()
+        SpritePack.init(c.SPRITE_PACK_PATH)
+        ImageManager.init(c.IMAGE_MEMORY_BUDGET)
+        VariantCache.init(c.VARIANT_CACHE_DIRECTORY)
+        SoundManager.init(c.SOUND_CACHE_DIRECTORY, c.SOUND_MEMORY_BUDGET)
+        # The pool decodes the game frame's assets while the first screens show, and Instructions
+        # collects them. Only what the first screen shows is decoded before it.
+        self.asset_loader = AssetLoader(c.ASSET_LOADER_WORKERS)
+        self.asset_loader.submit(asset_manifest.IMAGES, asset_manifest.SOUNDS)
+        self.asset_loader.load(asset_manifest.STARTUP_IMAGES)
+        self.reticle = ImageManager.load("assets/images/reticle.png")
+        AnimationManager.init()
+        Profiler.init()
+        self.overlay = PerformanceOverlay()
         self.main_music_started = False
-        self.intro_music = pygame.mixer.Sound("assets/sounds/Music-Intro.mp3")
-        self.intro_music.set_volume(0.4)
-        self.intro_music.play(-1)
+        Music.init()
+        Music.play(c.INTRO_MUSIC_PATH, c.MUSIC_VOLUME)
         self.tutorial = False
-        pygame.mixer.set_num_channels(32)
+        VoiceManager.init(c.MIXER_CHANNELS)
 
     def main(self):
         current_frame = Instructions(self)
@@ -31,13 +52,22 @@ class Game:
         self.clock.tick(c.FRAMERATE)
 
         while True:
-            dt, events = self.get_events()
+            frame_time, events = self.get_events()
+            # Only the simulation's step is clamped. The profiler gets how long the frame really took.
+            dt = frame_time
             if dt > 0.05:
                 dt = 0.05
-            current_frame.update(dt, events)
-            current_frame.draw(self.screen, (0, 0))
+            with Profiler.measure("update"):
+                current_frame.update(dt, events)
+            with Profiler.measure("draw"):
+                current_frame.draw(self.target, (0, 0))
+                self.target.present()
+            self.overlay.draw(self.screen, current_frame)
             self.draw_reticle(self.screen)
             pygame.display.flip()
+            Profiler.end_frame(frame_time)
+            VoiceManager.end_frame()
+            Music.update()
 
             if current_frame.done:
                 current_frame = current_frame.next_frame()
@@ -55,6 +85,8 @@ class Game:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                 pygame.quit()
                 sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.overlay.toggle()
 
         return dt, events
 
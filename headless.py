@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+import argparse
+import pygame
+
+import constants as c
+from camera import Camera
+from sound_manager import SoundManager
+from animation_manager import AnimationManager
+from image_manager import ImageManager
+from sprite_pack import SpritePack
+from variant_cache import VariantCache
+from voice_manager import VoiceManager
+from controls import Controls, BotInput
+from frame import GameFrame
+from render_target import RenderTarget
+
+
+class HeadlessGame:
+    """
+    Stand-in for Game that runs the simulation with no window, no audio and no framerate cap.
+    GameFrame only needs the attributes defined here, so it can be driven tick by tick with a
+    synthetic input source.
+    """
+
+    def __init__(self, input_source=None, seed=None):
+        # Must be set before pygame initializes the display and mixer
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        if seed is not None:
+            random.seed(seed)
+        pygame.init()
+        self.screen = pygame.display.set_mode(c.WINDOW_SIZE)
+        self.target = RenderTarget(self.screen, c.RENDER_SCALE, c.RENDER_SMOOTH_UPSCALE)
+        Camera.init()
+        SpritePack.init(c.SPRITE_PACK_PATH)
+        ImageManager.init(c.IMAGE_MEMORY_BUDGET)
+        VariantCache.init(c.VARIANT_CACHE_DIRECTORY)
+        SoundManager.init(c.SOUND_CACHE_DIRECTORY, c.SOUND_MEMORY_BUDGET)
+        AnimationManager.init()
+        VoiceManager.init(c.MIXER_CHANNELS)
+        self.input = input_source if input_source is not None else BotInput()
+        Controls.init(self.input)
+        # Skip the music switch in GameFrame.update; there is nothing to hear
+        self.main_music_started = True
+        self.tutorial = False
+        self.frame = None
+
+    def load(self):
+        self.frame = GameFrame(self)
+        self.frame.load()
+        return self.frame
+
+    def step(self, dt):
+        """ Advances the current frame by a single tick of dt seconds. """
+        if self.frame is None:
+            self.load()
+        events = self.input.update(dt, self.frame)
+        self.frame.update(dt, events)
+        VoiceManager.end_frame()
+        if self.frame.done:
+            self.frame = self.frame.next_frame()
+            self.frame.load()
+
+    def run(self, ticks, dt=1/c.FRAMERATE):
+        """
+        Runs the given number of ticks as fast as possible.
+        :return: A dict with the number of ticks run, the elapsed wall time and ticks per second
+        """
+        if self.frame is None:
+            self.load()
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.step(dt)
+        elapsed = time.perf_counter() - start
+        return {
+            "ticks": ticks,
+            "seconds": elapsed,
+            "ticks_per_second": ticks/elapsed if elapsed > 0 else float("inf"),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game simulation with no window or audio.")
+    parser.add_argument("--ticks", type=int, default=3600, help="number of updates to run")
+    parser.add_argument("--dt", type=float, default=1/c.FRAMERATE, help="simulated seconds per tick")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random module")
+    args = parser.parse_args(argv)
+
+    game = HeadlessGame(seed=args.seed)
+    result = game.run(args.ticks, args.dt)
+    print(f"{result['ticks']} ticks in {result['seconds']:.3f}s ({result['ticks_per_second']:.1f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
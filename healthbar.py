@@ -3,6 +3,8 @@ import constants as c
 from primitives import Pose
 import time
 import math
+from image_manager import ImageManager
+from variant_cache import VariantCache
 
 class BossHealthBar:
     PLAYER_BAR_OFFSET = (55, 16)
@@ -25,21 +27,23 @@ class BossHealthBar:
         self.visible = False
 
     def load_images(self):
-        self.background = pygame.image.load("assets/images/boss_bar.png")
-        self.head_bar = pygame.image.load("assets/images/boss_hp.png")
-        self.head_bar_blink = pygame.image.load("assets/images/boss_hp_blink.png")
-        self.head_bar.set_colorkey((255, 0, 255))
-        self.hand_bar_left = pygame.image.load("assets/images/boss_hand_hp_left.png")
-        self.hand_bar_left_blink = pygame.image.load("assets/images/boss_hand_hp_left_blink.png")
-        self.hand_bar_left_blink.set_colorkey((255, 0, 255))
-        self.hand_bar_left.set_colorkey((255, 255, 255))
-        self.hand_bar_right = pygame.transform.flip(self.hand_bar_left, True, False)
-        self.hand_bar_right_blink = pygame.transform.flip(self.hand_bar_left_blink, True, False)
-        self.hands = pygame.image.load("assets/images/boss bar hands.png")
-        self.player_bar = pygame.image.load("assets/images/hp_bar_front.png")
-        self.player_bar_back = pygame.image.load("assets/images/hp_bar_back.png")
-        self.player_bar_front_low = pygame.image.load("assets/images/hp_bar_front_low.png")
-        self.player_bar.set_colorkey((255, 0, 255))
+        self.background = ImageManager.load("assets/images/boss_bar.png")
+        self.head_bar = ImageManager.load("assets/images/boss_hp.png", colorkey=(255, 0, 255))
+        self.head_bar_blink = ImageManager.load("assets/images/boss_hp_blink.png")
+        self.hand_bar_left = ImageManager.load("assets/images/boss_hand_hp_left.png", colorkey=(255, 255, 255))
+        self.hand_bar_left_blink = ImageManager.load("assets/images/boss_hand_hp_left_blink.png", colorkey=(255, 0, 255))
+        self.hand_bar_right = self.load_flipped("assets/images/boss_hand_hp_left.png", (255, 255, 255))
+        self.hand_bar_right_blink = self.load_flipped("assets/images/boss_hand_hp_left_blink.png", (255, 0, 255))
+        self.hands = ImageManager.load("assets/images/boss bar hands.png")
+        self.player_bar = ImageManager.load("assets/images/hp_bar_front.png", colorkey=(255, 0, 255))
+        self.player_bar_back = ImageManager.load("assets/images/hp_bar_back.png")
+        self.player_bar_front_low = ImageManager.load("assets/images/hp_bar_front_low.png")
+
+    @staticmethod
+    def load_flipped(path, colorkey):
+        """ Loads an image mirrored horizontally """
+        return VariantCache.get("flipped", lambda: pygame.transform.flip(ImageManager.load(path, colorkey=colorkey), True, False),
+                                sources=[path], colorkey=colorkey)
 
     def update(self, dt, events):
         pass
@@ -0,0 +1,125 @@
+import pygame
+import threading
+from collections import OrderedDict
+from sprite_pack import SpritePack
+
+
+class ImageManager:
+    """
+    Static class to handle loading of pygame surfaces to improve performance. Images are converted
+    to the display's pixel format once when loaded, so blitting them doesn't have to. Images in the
+    SpritePack are already in that format and aren't decoded at all.
+    Safe to load from several threads at once.
+    """
+
+    lock = threading.Lock()
+    initialized = False
+    images = None
+    budget = None
+    total_bytes = 0
+
+    @staticmethod
+    def init(budget=None):
+        """
+        :param budget: Maximum number of bytes of surfaces to keep. Least recently used images are
+            forgotten once it's exceeded. None means no limit.
+        """
+        ImageManager.initialized = True
+        ImageManager.images = OrderedDict()
+        ImageManager.budget = budget
+        ImageManager.total_bytes = 0
+
+    @staticmethod
+    def check_initialized():
+        if not ImageManager.initialized:
+            raise Exception("Must call ImageManager.init() before any other methods.")
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_pitch() * surface.get_height()
+
+    @staticmethod
+    def clear(path):
+        """
+        Forgets one thing.
+        :param path: The path of the file to remove from memory
+        :return:
+        """
+        ImageManager.check_initialized()
+        for key in [key for key in ImageManager.images if key[0] == path]:
+            ImageManager.total_bytes -= ImageManager.surface_bytes(ImageManager.images.pop(key))
+
+    @staticmethod
+    def clear_all():
+        """
+        Forgets everything
+        """
+        ImageManager.check_initialized()
+        ImageManager.images = OrderedDict()
+        ImageManager.total_bytes = 0
+
+    @staticmethod
+    def convert(surface, colorkey=None):
+        """
+        Converts a surface to the display's pixel format, if there is a display to match.
+        Colorkeyed surfaces are RLE encoded, which makes skipping their transparent pixels cheap.
+        """
+        if pygame.display.get_surface() is not None:
+            if surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+        if colorkey is not None:
+            surface.set_colorkey(colorkey, pygame.RLEACCEL)
+        return surface
+
+    @staticmethod
+    def load(path, colorkey=None):
+        """
+        Loads a surface from file or from cache
+        :param path: The path of the image
+        :param colorkey: Color to treat as transparent, if any
+        :return: The surface. This is likely the same reference others are using, so don't be destructive.
+        """
+        ImageManager.check_initialized()
+        key = path, colorkey
+        with ImageManager.lock:
+            if key in ImageManager.images:
+                ImageManager.images.move_to_end(key)
+                return ImageManager.images[key]
+            surface = SpritePack.image(path)
+            if surface is None:
+                surface = ImageManager.convert(pygame.image.load(path), colorkey)
+            elif colorkey is not None:
+                surface.set_colorkey(colorkey, pygame.RLEACCEL)
+            return ImageManager.store(key, surface)
+
+    @staticmethod
+    def add(path, surface, colorkey=None):
+        """
+        Caches an image that was decoded somewhere else, as if it had been loaded from path
+        :param path: The path the image was decoded from
+        :param surface: The decoded image, not yet converted
+        :param colorkey: Color to treat as transparent, if any
+        """
+        ImageManager.check_initialized()
+        key = path, colorkey
+        with ImageManager.lock:
+            if key not in ImageManager.images:
+                ImageManager.store(key, ImageManager.convert(surface, colorkey))
+
+    @staticmethod
+    def store(key, surface):
+        ImageManager.images[key] = surface
+        ImageManager.total_bytes += ImageManager.surface_bytes(surface)
+        ImageManager.enforce_budget()
+        return surface
+
+    @staticmethod
+    def enforce_budget():
+        """ Forgets least recently used images until the total fits the budget. Keeps the newest one. """
+        if ImageManager.budget is None:
+            return
+        while ImageManager.total_bytes > ImageManager.budget and len(ImageManager.images) > 1:
+            key, surface = ImageManager.images.popitem(last=False)
+            ImageManager.total_bytes -= ImageManager.surface_bytes(surface)
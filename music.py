@@ -0,0 +1,67 @@
+import pygame
+
+
+class Music:
+    """
+    Static class that streams background music from disk through pygame.mixer.music, so only a
+    little of the track is decoded at a time. The mixer streams one track at a time, so changing
+    tracks fades the old one out and then fades the new one in.
+    """
+
+    initialized = False
+    current = None
+    pending = None
+
+    @staticmethod
+    def init():
+        Music.initialized = True
+        Music.current = None
+        Music.pending = None
+
+    @staticmethod
+    def check_initialized():
+        if not Music.initialized:
+            raise Exception("Must call Music.init() before any other methods.")
+
+    @staticmethod
+    def play(path, volume=1.0, loops=-1, fade_ms=0):
+        """
+        Starts streaming a track
+        :param path: The path of the track
+        :param volume: Volume once it's faded in
+        :param loops: How many times to repeat it, -1 forever
+        :param fade_ms: How long the current track takes to fade out, and this one to fade in
+        """
+        Music.check_initialized()
+        if path == Music.current and Music.pending is None:
+            return
+        if Music.current is not None and fade_ms and pygame.mixer.music.get_busy():
+            pygame.mixer.music.fadeout(fade_ms)
+            Music.pending = path, volume, loops, fade_ms
+            return
+        Music.start(path, volume, loops, fade_ms)
+
+    @staticmethod
+    def start(path, volume, loops, fade_ms):
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops=loops, fade_ms=fade_ms)
+        Music.current = path
+        Music.pending = None
+
+    @staticmethod
+    def update():
+        """ Starts the next track once the last one has faded out. Call once a frame. """
+        Music.check_initialized()
+        if Music.pending is not None and not pygame.mixer.music.get_busy():
+            Music.start(*Music.pending)
+
+    @staticmethod
+    def stop(fade_ms=0):
+        Music.check_initialized()
+        Music.pending = None
+        Music.current = None
+        if fade_ms:
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
+            pygame.mixer.music.stop()
@@ -0,0 +1,68 @@
+import pygame
+from image_manager import ImageManager
+from variant_cache import VariantCache
+
+
+class Overlay:
+    """
+    Full screen layers drawn over a frame, like flashes, fades and end screens. Add the layers that
+    are showing each frame, in the order they go on, and draw them all at once. Runs of solid color
+    layers are merged into a single blend, and nothing is drawn when every layer is transparent.
+    """
+
+    def __init__(self):
+        self.layers = []
+        self.images = {}
+
+    def image(self, path, size):
+        """
+        :return: The image at path scaled to size. It's only scaled once per size.
+        """
+        key = path, tuple(size)
+        if key not in self.images:
+            image = ImageManager.load(path)
+            if image.get_size() != key[1]:
+                image = VariantCache.get("fullscreen", lambda: pygame.transform.scale(image, key[1]),
+                                         sources=[path], size=key[1])
+            self.images[key] = image
+        return self.images[key]
+
+    def add_color(self, color, alpha=255):
+        """ Blends a solid color over the screen """
+        alpha = min(max(alpha, 0), 255)
+        if alpha:
+            self.layers.append(("color", color, alpha))
+
+    def add_light(self, color):
+        """ Adds a color to the screen, brightening it """
+        if any(color):
+            self.layers.append(("light", color, 255))
+
+    def add_image(self, path, alpha=255):
+        """ Blends an image, scaled to fill the screen, over it """
+        alpha = min(max(alpha, 0), 255)
+        if alpha:
+            self.layers.append(("image", path, alpha))
+
+    def draw(self, surface):
+        """ Draws the layers added since the last draw on surface, a RenderTarget, and forgets them """
+        layers, self.layers = self.layers, []
+        size = surface.get_size()
+        # Premultiplied color and how much of the screen shows through the solid layers so far
+        color, through = (0, 0, 0), 1
+        for kind, value, alpha in layers + [("end", None, 0)]:
+            if kind == "color":
+                alpha /= 255
+                color = [channel * (1 - alpha) + new * alpha for channel, new in zip(color, value)]
+                through *= 1 - alpha
+                continue
+            if through < 1:
+                surface.blend([channel / (1 - through) for channel in color], 1 - through)
+                color, through = (0, 0, 0), 1
+            if kind == "light":
+                surface.fill(value, special_flags=pygame.BLEND_ADD)
+            elif kind == "image":
+                image = self.image(value, size)
+                image.set_alpha(alpha)
+                surface.blit(image, (0, 0))
+
@@ -2,41 +2,43 @@ from primitives import Pose
 import random
 import math
 import pygame
+import numpy as np
 import constants as c
-from pyracy.sprite_tools import Sprite, Animation
+from transform_cache import TransformCache
+from image_manager import ImageManager
+from variant_cache import VariantCache
 
 
 class Particle:
+    """
+    Describes a particle at the moment it is spawned. Add it to a ParticleSystem, which copies its
+    state into arrays and takes care of moving, aging and drawing it from then on. Only the
+    subclasses below, which set kind, can be added.
+    """
+
+    kind = None
+    drag = 1.0  # Fraction of the velocity kept after one second
 
     def __init__(self, position=(0, 0), velocity=(0, 0), duration=1):
         self.position = Pose(position)
         self.velocity = Pose(velocity)
-        self.destroyed = False
         self.duration = duration
         self.age = 0
         self.layer = c.BACKGROUND
-
-    def update(self, dt, events):
-        if self.destroyed:
-            return
-        self.position += self.velocity * dt
-        if self.age > self.duration:
-            self.destroy()
-        self.age += dt
-
-    def draw(self, surf, offset=(0, 0)):
-        if self.destroyed:
-            return
-
-    def through(self):
-        return min(0.999, self.age/self.duration)
-
-    def destroy(self):
-        self.destroyed = True
+        self.surf = None
+        self.angle = 0
+        self.z = 0
+        self.z_velocity = 0
+        self.landed = True
+        self.color = (255, 255, 255)
+        self.scale = 1
 
 
 class Puff(Particle):
+    kind = 0
+    drag = 0.01
     surfs = []
+
     def __init__(self, position=(0, 0), velocity=None):
         angle = random.random() * math.pi * 2
         if not velocity:
@@ -49,96 +51,55 @@ class Puff(Particle):
         self.age += random.random() * self.duration * 0.5
         if not Puff.surfs:
             Puff.surfs = []
-            sheet = pygame.image.load("assets/images/puff.png")
+            sheet = ImageManager.load("assets/images/puff.png")
             width = sheet.get_width()//3
             for i in range(3):
                 new_surf = pygame.Surface((width, sheet.get_height()))
                 new_surf.blit(sheet, (i*-width, 0))
-                new_surf.set_colorkey((255, 0, 255))
+                new_surf.set_colorkey((255, 0, 255), pygame.RLEACCEL)
                 Puff.surfs.append(new_surf)
         self.surf = random.choice(Puff.surfs)
 
-    def update(self, dt, events):
-        super().update(dt, events)
-        self.velocity *= 0.01**dt
-
-
-    def draw(self, surf, offset=(0, 0)):
-        w = self.surf.get_width() * (1 - 0.8*self.through()) * 0.7
-        h = self.surf.get_height() * (1 - 0.8*self.through()) * 0.7
-        if w < 0 or h < 0:
-            pass
-        my_surf = pygame.transform.scale(self.surf, (w, h))
-        x = -offset[0] - w//2 + self.position.x
-        y = -offset[1] - h//2 + self.position.y
-        my_surf.set_alpha(180 * (1-self.through()**2))
-        surf.blit(my_surf, (x, y))
-
 
 class MuzzleFlash(Particle):
+    kind = 1
     surf = None
 
     def __init__(self, position, angle, duration=0.08):
         if not MuzzleFlash.surf:
-            MuzzleFlash.surf = pygame.image.load("assets/images/muzzle_flash.png")
+            MuzzleFlash.surf = ImageManager.load("assets/images/muzzle_flash.png", colorkey=(255, 0, 255))
 
         super().__init__(position, duration=duration)
-        self.surf = pygame.transform.rotate(MuzzleFlash.surf, angle)
-        self.surf.set_colorkey((255, 0, 255))
+        self.surf = MuzzleFlash.surf
+        self.angle = angle
         self.layer = c.FOREGROUND
 
-    def draw(self, surf, offset=(0, 0)):
-        w = self.surf.get_width() * 1.4 #* (1 - self.through()**2)
-        h = self.surf.get_height() * 1.4#* (1 - self.through()**2)
-        if w < 0 or h < 0:
-            pass
-        my_surf = pygame.transform.scale(self.surf, (w, h))
-        x = -offset[0] - w//2 + self.position.x
-        y = -offset[1] - h//2 + self.position.y
-        my_surf.set_alpha(255 * (1-self.through()**2))
-        surf.blit(my_surf, (x, y))
-
 
 class Casing(Particle):
+    kind = 2
     surf = None
 
     def __init__(self, position, duration=20):
 
         x_velocity = (random.random() * 80 + 30) * random.choice((-1, 1))
-        self.z_velocity = -750
         velocity = Pose((x_velocity, 0))
-        self.z = -0
         super().__init__(position, velocity=velocity.get_position(), duration=duration)
+        self.z_velocity = -750
+        self.z = -0
         self.landed = False
         if not Casing.surf:
-            Casing.surf = pygame.image.load("assets/images/casing.png")
-        self.surf = pygame.transform.scale(Casing.surf.copy(), (10, 20))
-        self.random_angle = random.random()*360
-
-    def update(self, dt, events):
-        super().update(dt, events)
-        if not self.landed:
-            self.z += self.z_velocity*dt
-            self.z_velocity += 4000*dt
-            if self.z > 40:
-                self.landed = True
-                self.z_velocity = 0
-                self.velocity = Pose((0, 0))
-
-    def draw(self, surf, offset=(0, 0)):
-        angle = self.through() * 200 * (self.velocity.x) + self.random_angle
-        casing = pygame.transform.rotate(self.surf, angle)
-        x = self.position.x - offset[0] - casing.get_width()
-        y = self.position.y - offset[1] - casing.get_height() + self.z
-        surf.blit(casing, (x, y))
-
+            path = "assets/images/casing.png"
+            Casing.surf = VariantCache.get("scaled", lambda: pygame.transform.scale(ImageManager.load(path), (10, 20)),
+                                           sources=[path], size=(10, 20))
+        self.surf = Casing.surf
+        self.angle = random.random()*360
 
 
 class SparkParticle(Particle):
+    kind = 3
+    drag = 0.005
 
     def __init__(self, position, velocity=None, duration=0.5, color=(255, 0, 0), scale=40, velocity_scale=1.0):
-        self.color = color
-        self.scale = scale
         velocity_mag = (random.random()**2 * 1600 + 800) * velocity_scale
         if not velocity:
             velocity_angle = random.random() * 2 * math.pi
@@ -148,31 +109,189 @@ class SparkParticle(Particle):
         velocity_y = math.cos(velocity_angle) * velocity_mag
         velocity = velocity_x, velocity_y
         super().__init__(position=position, velocity=velocity, duration=duration)
+        self.color = color
+        self.scale = scale
         self.age += random.random() * 0.3
         self.layer = c.FOREGROUND
 
-    def update(self, dt, events):
-        super().update(dt, events)
-        self.velocity *= 0.005**dt
 
+class ParticleSystem:
+    """
+    Holds every live particle as a structure of NumPy arrays, one entry per particle, so that
+    moving, slowing and expiring them is done for all of them at once instead of object by object.
+    Particles keep the order they were added in, which is also the order they are drawn in.
+    """
+
+    KIND_NAMES = {Puff.kind: "Puff", MuzzleFlash.kind: "MuzzleFlash", Casing.kind: "Casing", SparkParticle.kind: "SparkParticle"}
+    SPARK_CORNERS = np.array([[3, 0], [0, -0.25], [-2, 0], [0, 0.25]])
+    CASING_GRAVITY = 4000
+    CASING_FLOOR = 40
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.pending = []
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.age = np.zeros(capacity)
+        self.duration = np.ones(capacity)
+        self.layer = np.zeros(capacity, dtype=np.int8)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.drag = np.ones(capacity)
+        self.z = np.zeros(capacity)
+        self.z_velocity = np.zeros(capacity)
+        self.landed = np.ones(capacity, dtype=bool)
+        self.angle = np.zeros(capacity)
+        self.scale = np.ones(capacity)
+        self.color = np.zeros((capacity, 3))
+        self.surf = np.empty(capacity, dtype=object)
+
+    def columns(self):
+        return ("position", "velocity", "age", "duration", "layer", "kind", "drag",
+                "z", "z_velocity", "landed", "angle", "scale", "color", "surf")
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def append(self, particle):
+        """ Queues a particle to be added to the arrays the next time they are used """
+        if particle.kind not in self.KIND_NAMES:
+            raise ValueError(f"{type(particle).__name__} has no kind a ParticleSystem can draw")
+        self.pending.append(particle)
+
+    def flush(self):
+        """ Copies queued particles into the arrays, growing them if needed """
+        if not self.pending:
+            return
+        new = self.pending
+        self.pending = []
+        start = self.count
+        end = start + len(new)
+        capacity = len(self.age)
+        if end > capacity:
+            while capacity < end:
+                capacity *= 2
+            for name in self.columns():
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:start] = old[:start]
+                setattr(self, name, grown)
+
+        self.position[start:end] = [(p.position.x, p.position.y) for p in new]
+        self.velocity[start:end] = [(p.velocity.x, p.velocity.y) for p in new]
+        self.age[start:end] = [p.age for p in new]
+        self.duration[start:end] = [p.duration for p in new]
+        self.layer[start:end] = [p.layer for p in new]
+        self.kind[start:end] = [p.kind for p in new]
+        self.drag[start:end] = [p.drag for p in new]
+        self.z[start:end] = [p.z for p in new]
+        self.z_velocity[start:end] = [p.z_velocity for p in new]
+        self.landed[start:end] = [p.landed for p in new]
+        self.angle[start:end] = [p.angle for p in new]
+        self.scale[start:end] = [p.scale for p in new]
+        self.color[start:end] = [p.color for p in new]
+        self.surf[start:end] = [p.surf for p in new]
+        self.count = end
+
+    def count_by_kind(self):
+        self.flush()
+        kinds, counts = np.unique(self.kind[:self.count], return_counts=True)
+        return {self.KIND_NAMES[kind]: int(count) for kind, count in zip(kinds, counts)}
+
+    def clear(self):
+        self.count = 0
+        self.pending = []
+        self.surf[:] = None
 
-    def draw(self, surf, offset=(0, 0)):
-        if self.destroyed:
+    def update(self, dt, events):
+        self.flush()
+        n = self.count
+        if not n:
             return
-        corners = [[3, 0], [0, -0.25], [-2, 0], [0, 0.25]]
-
-        angle = math.atan2(self.velocity.y, self.velocity.x)
-
-        scale = self.scale * (1 - self.through())
-        for corner in corners:
-            original_angle = math.atan2(corner[1], corner[0])
-            new_angle = angle - original_angle
-            mag = math.sqrt(corner[0]**2 + corner[1]**2)
-            mag *= scale
-            corner[0] = math.cos(new_angle) * mag
-            corner[1] = math.sin(new_angle) * mag
-            corner[0] += self.position.x - offset[0]
-            corner[1] += self.position.y - offset[1]
-
-        color = tuple([self.color[i] * self.through() + 255 * (1 - self.through()) for i in range(3)])
-        pygame.draw.polygon(surf, color, corners)
+        self.position[:n] += self.velocity[:n] * dt
+        expired = self.age[:n] > self.duration[:n]
+        self.age[:n] += dt
+        self.velocity[:n] *= (self.drag[:n] ** dt)[:, np.newaxis]
+
+        # Casings fly up and fall until they hit the floor, then stop
+        falling = ~self.landed[:n]
+        if falling.any():
+            self.z[:n][falling] += self.z_velocity[:n][falling] * dt
+            self.z_velocity[:n][falling] += self.CASING_GRAVITY * dt
+            landing = falling & (self.z[:n] > self.CASING_FLOOR)
+            self.landed[:n][landing] = True
+            self.z_velocity[:n][landing] = 0
+            self.velocity[:n][landing] = 0
+
+        if expired.any():
+            keep = ~expired
+            for name in self.columns():
+                column = getattr(self, name)
+                kept = column[:n][keep]
+                column[:len(kept)] = kept
+            self.count = len(kept)
+            self.surf[self.count:n] = None
+
+    def through(self):
+        n = self.count
+        return np.minimum(0.999, self.age[:n] / self.duration[:n])
+
+    def draw(self, surface, offset=(0, 0), layer=None, layers=None):
+        """
+        Draws the particles of one layer, or all of them if layer is None
+        :param layers: RenderQueue layer for each particle layer. If given, surface is a RenderQueue
+            and each particle is queued on its layer's.
+        """
+        self.flush()
+        n = self.count
+        if not n:
+            return
+        if layer is None:
+            indices = np.arange(n)
+        else:
+            indices = np.flatnonzero(self.layer[:n] == layer)
+        if not len(indices):
+            return
+
+        through = self.through()
+        x = self.position[:n, 0] - offset[0]
+        y = self.position[:n, 1] - offset[1]
+        kinds = self.kind[:n].tolist()
+
+        # Spark polygons, all computed together
+        spark_corners = None
+        if (self.kind[indices] == SparkParticle.kind).any():
+            corner_angles = np.arctan2(self.SPARK_CORNERS[:, 1], self.SPARK_CORNERS[:, 0])
+            corner_mags = np.sqrt(self.SPARK_CORNERS[:, 0]**2 + self.SPARK_CORNERS[:, 1]**2)
+            angle = np.arctan2(self.velocity[:n, 1], self.velocity[:n, 0])
+            new_angles = angle[:, np.newaxis] - corner_angles
+            mags = corner_mags * (self.scale[:n] * (1 - through))[:, np.newaxis]
+            spark_corners = np.stack((np.cos(new_angles) * mags + x[:, np.newaxis],
+                                      np.sin(new_angles) * mags + y[:, np.newaxis]), axis=2).tolist()
+            spark_colors = (self.color[:n] * through[:, np.newaxis] + 255 * (1 - through[:, np.newaxis])).tolist()
+
+        through = through.tolist()
+        x = x.tolist()
+        y = y.tolist()
+        z = self.z[:n].tolist()
+        x_velocity = self.velocity[:n, 0].tolist()
+        angles = self.angle[:n].tolist()
+        particle_layers = self.layer[:n].tolist()
+        surfs = self.surf
+        for i in indices.tolist():
+            kind = kinds[i]
+            if layers:
+                surface.set_layer(layers[particle_layers[i]])
+            if kind == SparkParticle.kind:
+                surface.polygon(spark_colors[i], spark_corners[i])
+            elif kind == Puff.kind:
+                my_surf = TransformCache.get(surfs[i], (1 - 0.8*through[i]) * 0.7)
+                my_surf.set_alpha(180 * (1-through[i]**2))
+                surface.blit(my_surf, (x[i] - my_surf.get_width()//2, y[i] - my_surf.get_height()//2))
+            elif kind == MuzzleFlash.kind:
+                my_surf = TransformCache.get(surfs[i], 1.4, angles[i])
+                my_surf.set_alpha(255 * (1-through[i]**2))
+                surface.blit(my_surf, (x[i] - my_surf.get_width()//2, y[i] - my_surf.get_height()//2))
+            elif kind == Casing.kind:
+                angle = through[i] * 200 * x_velocity[i] + angles[i]
+                casing = TransformCache.get(surfs[i], angle=angle)
+                surface.blit(casing, (x[i] - casing.get_width(), y[i] - casing.get_height() + z[i]))
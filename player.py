@@ -1,4 +1,5 @@
 from pyracy.sprite_tools import Sprite, Animation
+from animation_manager import AnimationManager
 from primitives import Pose
 import pygame
 import constants as c
@@ -7,8 +8,92 @@ from camera import Camera
 from particle import Puff, MuzzleFlash, SparkParticle
 from projectile import PistolBullet, Bread, Shuriken
 import random
+from concurrent.futures import ThreadPoolExecutor
 from sound_manager import SoundManager
+from controls import Controls
+from transform_cache import TransformCache
+from image_manager import ImageManager
 from enemy import Grunt, BossMan, Hand
+from voice_manager import VoiceManager
+
+class Weapon:
+    """
+    The hand animations and sounds of one weapon. Hand animations are named after the weapon, like
+    GunIdleRight and GunFireLeft.
+    """
+
+    def __init__(self, name, file_name, sheet_size, idle_frames, fire_frames, fire_start_frame=0, fire_fps=None,
+                 fire_loop=False, sounds=(), volume=1.0, pin_sounds=False, other_animations=None):
+        """
+        :param file_name: Sheet of the hand animations, in assets/images
+        :param sounds: Paths of the sounds firing picks from
+        :param pin_sounds: Whether to keep the sounds in memory for good once they're loaded, for
+            weapons that fire all the time
+        :param other_animations: Animations besides the hand's, by name, as get_animation arguments
+        """
+        self.name = name
+        self.file_name = file_name
+        self.sheet_size = sheet_size
+        self.idle_frames = idle_frames
+        self.fire_frames = fire_frames
+        self.fire_start_frame = fire_start_frame
+        self.fire_fps = fire_fps
+        self.fire_loop = fire_loop
+        self.sounds = sounds
+        self.volume = volume
+        self.pin_sounds = pin_sounds
+        self.other_animations = other_animations or {}
+
+    def animations(self):
+        """ :return: (path, AnimationManager.load arguments) of every animation load makes """
+        found = []
+        for frame_count in (self.idle_frames, self.fire_frames):
+            for reverse_x in (False, True):
+                found.append(Player.animation_args(self.file_name, self.sheet_size, frame_count, reverse_x=reverse_x))
+        found += [Player.animation_args(*args) for args in self.other_animations.values()]
+        return found
+
+    def load(self):
+        """
+        Loads or finds everything the weapon uses. Safe to call from a worker thread.
+        :return: Idle and fire hand animations by name, other animations by name, and sounds
+        """
+        idle, fire = {}, {}
+        for side, reverse_x in (("Right", False), ("Left", True)):
+            idle[f"{self.name}Idle{side}"] = Player.get_animation(self.file_name, self.sheet_size, self.idle_frames,
+                                                                 reverse_x=reverse_x)
+            fire[f"{self.name}Fire{side}"] = Player.get_animation(self.file_name, self.sheet_size, self.fire_frames,
+                                                                 reverse_x=reverse_x, start_frame=self.fire_start_frame)
+        other = {name: Player.get_animation(*args) for name, args in self.other_animations.items()}
+        load = SoundManager.pin if self.pin_sounds else SoundManager.load
+        sounds = [load(path) for path in self.sounds]
+        return idle, fire, other, sounds
+
+
+WEAPONS = {
+    c.GUN: Weapon("Gun", "gun.png", (4, 1), 1, 4, fire_start_frame=1,
+                  sounds=["assets/sounds/Pistol_v2.mp3"]*3, volume=0.5, pin_sounds=True),
+    c.GATLING: Weapon("Gatling", "gatling_arm.png", (2, 1), 1, 2, fire_fps=24, fire_loop=True,
+                      sounds=[f"assets/sounds/Gatling-Gun-{rel+1}.mp3" for rel in range(3)], volume=0.3,
+                      pin_sounds=True),
+    c.BREAD: Weapon("Bread", "bread_arm.png", (4, 1), 1, 4, fire_start_frame=1,
+                    sounds=[f"assets/sounds/Bread-{rel+1}.mp3" for rel in range(3)], volume=0.2),
+    c.SHURIKEN: Weapon("Shuriken", "shuriken_arm.png", (5, 1), 1, 4, fire_start_frame=1,
+                       sounds=[f"assets/sounds/Shuriken-{rel+1}.mp3" for rel in range(3)], volume=0.3),
+    c.KNIFE: Weapon("Knife", "knife arm final.png", (6, 1), 1, 6, fire_start_frame=1, fire_fps=24,
+                    sounds=["assets/sounds/Knife-2.mp3"], volume=0.3),
+    c.FIRE: Weapon("Fire", "fire_arm.png", (14, 1), 2, 10,
+                   sounds=["assets/sounds/Flame-Burst_v2.ogg"]*3, volume=1,
+                   other_animations={"Idle": ("flame.png", (14, 1), 4),
+                                     "Vanish": ("flame.png", (14, 1), 14, False, 2)}),
+}
+
+# The weapon the player holds when the game frame starts, loaded along with the rest of the frame
+STARTING_WEAPON = c.GUN
+
+# One thread, reused, loads weapons ahead of use, in the order rolls ask for them
+WEAPON_PREFETCHER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="weapon_prefetch")
+
 
 class Player:
     def __init__(self, frame):
@@ -33,7 +118,7 @@ class Player:
         self.rolling = False
         self.firing = False
         self.last_fire = c.LAST_FIRE
-        self.weapon_mode = c.GUN
+        self.weapon_mode = STARTING_WEAPON
         self.aim_angle = 0
         self.arm_angle = 0
         self.aim_distance = c.INITIAL_AIM_DISTANCE
@@ -52,11 +137,15 @@ class Player:
     @staticmethod
     def get_animation(file_name: str, sheet_size: tuple[int, int], frame_count: int,
                       reverse_x: bool = False, start_frame: int = 0) -> Animation:
-        path = "assets/images/" + file_name
-        animation = Animation.from_path(path, sheet_size=sheet_size,
-                                        frame_count=frame_count,
-                                        reverse_x=reverse_x)
-        return animation
+        path, kwargs = Player.animation_args(file_name, sheet_size, frame_count, reverse_x, start_frame)
+        return AnimationManager.load(path, **kwargs)
+
+    @staticmethod
+    def animation_args(file_name: str, sheet_size: tuple[int, int], frame_count: int,
+                       reverse_x: bool = False, start_frame: int = 0) -> tuple[str, dict]:
+        """ :return: The path and AnimationManager.load arguments get_animation loads with """
+        return "assets/images/" + file_name, dict(sheet_size=sheet_size, frame_count=frame_count,
+                                                  reverse_x=reverse_x)
 
     def init_sprites(self):
         walk_right = Player.get_animation("walk_right.png", (8, 1), 8)
@@ -91,7 +180,7 @@ class Player:
         )
 
         self.number_surfs = {
-            mode: pygame.image.load(f"assets/images/{mode}.png") for mode in c.VALID_MODES
+            mode: ImageManager.load(f"assets/images/{mode}.png", colorkey=(255, 0, 255)) for mode in c.VALID_MODES
         }
 
         self.since_roll_finish = c.SINCE_ROLL_FINISH
@@ -117,25 +206,10 @@ class Player:
         self.since_kick = 0
         self.roll_sound = SoundManager.load("assets/sounds/die_roll.mp3")
 
-        self.footsteps = [SoundManager.load(f"assets/sounds/Footstep-{rel+1}.mp3") for rel in range(3)]
-        self.shots = [SoundManager.load(f"assets/sounds/Gatling-Gun-{rel+1}.mp3") for rel in range(3)]
-        self.shurikens = [SoundManager.load(f"assets/sounds/Shuriken-{rel+1}.mp3") for rel in range(3)]
-        self.pistols = [SoundManager.load(f"assets/sounds/Pistol_v2.mp3") for rel in range(3)]
-        self.flame_bursts = [SoundManager.load(f"assets/sounds/Flame-Burst_v2.ogg") for rel in range(3)]
-        self.breads = [SoundManager.load(f"assets/sounds/Bread-{rel+1}.mp3") for rel in range(3)]
+        self.footsteps = [SoundManager.pin(f"assets/sounds/Footstep-{rel+1}.mp3") for rel in range(3)]
         
         for step in self.footsteps:
             step.set_volume(0.1)
-        for shot in self.shots:
-            shot.set_volume(0.3)
-        for shuriken in self.shurikens:
-            shuriken.set_volume(0.3)
-        for shot in self.pistols:
-            shot.set_volume(0.5)
-        for shot in self.flame_bursts:
-            shot.set_volume(1)
-        for shot in self.breads:
-            shot.set_volume(0.2)
 
     def hide_stamina(self):
         self.stamina_visible = False
@@ -159,7 +233,7 @@ class Player:
                 direction = Pose((1, 0))
             direction.scale_to(1600)
             self.velocity += direction
-        self.take_damage.play()
+        VoiceManager.play(self.take_damage)
         self.frame.damage_flash_alpha = 255
         self.frame.shake(direction, amt=30)
         self.since_damage = 0
@@ -194,7 +268,7 @@ class Player:
         elif not self.rolling and was_rolling:
             self.hand_sprite.update(0, events)
 
-        mpos = Camera.screen_to_world(pygame.mouse.get_pos())
+        mpos = Camera.screen_to_world(Controls.get_mouse_pos())
         Camera.target = self.position.copy() * 0.8 + mpos * 0.2
         if self.animation_state == c.WALKING:
             self.since_kick += dt
@@ -206,7 +280,7 @@ class Player:
                 start_velocity = self.velocity * -0.3
                 start_velocity.rotate_position(20 * (i-1))
                 self.frame.particles.append(Puff(start_position.get_position(), start_velocity.get_position()))
-                random.choice(self.footsteps).play()
+                VoiceManager.play(random.choice(self.footsteps))
         if self.position.x - self.radius < 0:
             self.position.x = self.radius
         if self.position.y - self.radius < 0:
@@ -239,11 +313,11 @@ class Player:
 
     def die(self):
         self.dead = True
-        self.death_sound.play()
+        VoiceManager.play(self.death_sound)
 
     def process_inputs(self, dt, events):
         direction = Pose((0, 0))
-        pressed = pygame.key.get_pressed()
+        pressed = Controls.get_pressed()
         if pressed[pygame.K_w]:
             direction += Pose((0, -1))
         if pressed[pygame.K_s]:
@@ -265,7 +339,7 @@ class Player:
                         self.roll(direction)
                 if event.key == pygame.K_r and self.dead:
                     self.frame.restart()
-        mouse_pressed = pygame.mouse.get_pressed()
+        mouse_pressed = Controls.get_mouse_pressed()
         if mouse_pressed[0]:
             if not self.rolling and not self.firing and not self.dead:
                 self.fire()
@@ -330,7 +404,8 @@ class Player:
             direction.x = 1 if self.last_lr_direction == c.RIGHT else -1
         self.velocity = direction * c.ROLL_MULT_FACTOR
         self.firing = False
-        self.roll_sound.play()
+        VoiceManager.play(self.roll_sound)
+        self.prefetch_weapons(self.weapons_to_roll())
 
 
     def stop_rolling(self):
@@ -341,17 +416,19 @@ class Player:
         self.sprite.start_animation("IdleRight")
         for i in range(20):
             self.frame.particles.append(Puff(self.position.get_position()))
+        self.switch_weapon(random.choice(self.weapons_to_roll()))
+        self.frame.shake(self.velocity,15)
+
+    def weapons_to_roll(self):
         modes_to_roll = [mode for mode in c.VALID_MODES if mode is not self.weapon_mode]
         if not len(modes_to_roll):
             modes_to_roll = c.VALID_MODES
-        self.weapon_mode = random.choice(modes_to_roll)
-        self.frame.shake(self.velocity,15)
+        return modes_to_roll
 
     def draw(self, surface, offset=(0, 0)):
         if self.since_roll_finish < 0.5 and not self.rolling:
             if self.weapon_mode in self.number_surfs:
                 num = self.number_surfs[self.weapon_mode]
-                num.set_colorkey((255, 0, 255))
                 scale = 1
                 alpha = 1
                 if self.since_roll_finish < 0.1:
@@ -360,9 +437,9 @@ class Player:
                 elif self.since_roll_finish > 0.4:
                     scale = 1 - (self.since_roll_finish - 0.4) * 5
                     alpha = 1 - (self.since_roll_finish - 0.4) * 10
-                w = int(num.get_width() * scale)
-                h = int(num.get_height() * scale)
-                num = pygame.transform.scale(num, (w, h))
+                num = TransformCache.get(num, scale)
+                w = num.get_width()
+                h = num.get_height()
                 x = self.position.x - offset[0] - w//2
                 y = self.position.y - offset[1] - h//2 - 90
                 num.set_alpha(alpha*255)
@@ -380,107 +457,51 @@ class Player:
             self.stamina_sprite.draw(surface, offset)
 
     def populate_hand_sprite(self, hand_sprite):
-        gun_idle_right = Player.get_animation("gun.png", (4, 1), 1)
-        gun_idle_left = Player.get_animation("gun.png", (4, 1), 1, reverse_x=True)
-        gun_fire_right = Player.get_animation("gun.png", (4, 1), 4, start_frame=1)
-        gun_fire_left = Player.get_animation("gun.png", (4, 1), 4, reverse_x=True, start_frame=1)
-
-        gatling_idle_right = Player.get_animation("gatling_arm.png", (2, 1), 1)
-        gatling_idle_left = Player.get_animation("gatling_arm.png", (2, 1), 1, reverse_x=True)
-        gatling_fire_right = Player.get_animation("gatling_arm.png", (2, 1), 2)
-        gatling_fire_left = Player.get_animation("gatling_arm.png", (2, 1), 2, reverse_x=True)
-
-        bread_idle_right = Player.get_animation("bread_arm.png", (4, 1), 1)
-        bread_idle_left = Player.get_animation("bread_arm.png", (4, 1), 1, reverse_x=True)
-        bread_fire_right = Player.get_animation("bread_arm.png", (4, 1), 4, start_frame=1)
-        bread_fire_left = Player.get_animation("bread_arm.png", (4, 1), 4, reverse_x=True, start_frame=1)
-
-        shuriken_idle_right = Player.get_animation("shuriken_arm.png", (5, 1), 1)
-        shuriken_idle_left = Player.get_animation("shuriken_arm.png", (5, 1), 1, reverse_x=True)
-        shuriken_fire_right = Player.get_animation("shuriken_arm.png", (5, 1), 4, start_frame=1)
-        shuriken_fire_left = Player.get_animation("shuriken_arm.png", (5, 1), 4, reverse_x=True, start_frame=1)
-
-        knife_idle_right = Player.get_animation("knife arm final.png", (6, 1), 1)
-        knife_idle_left = Player.get_animation("knife arm final.png", (6, 1), 1, reverse_x=True)
-        knife_fire_right = Player.get_animation("knife arm final.png", (6, 1), 6, start_frame=1)
-        knife_fire_left = Player.get_animation("knife arm final.png", (6, 1), 6, reverse_x=True, start_frame=1)
-
-        fire_idle_right = Player.get_animation("fire_arm.png", (14, 1), 2)
-        fire_idle_left = Player.get_animation("fire_arm.png", (14, 1), 2, reverse_x=True)
-        fire_fire_right = Player.get_animation("fire_arm.png", (14, 1), 10, start_frame=0)
-        fire_fire_left = Player.get_animation("fire_arm.png", (14, 1), 10, reverse_x=True, start_frame=0)
-
-        hand_sprite.add_animation(
-            {
-                "GunIdleLeft": gun_idle_left,
-                "GunIdleRight": gun_idle_right,
-                "BreadIdleRight": bread_idle_right,
-                "BreadIdleLeft": bread_idle_left,
-                "ShurikenIdleRight": shuriken_idle_right,
-                "ShurikenIdleLeft": shuriken_idle_left,
-                "FireIdleLeft": fire_idle_left,
-                "FireIdleRight": fire_idle_right,
-                "GatlingIdleRight": gatling_idle_right,
-                "GatlingIdleLeft": gatling_idle_left,
-                "KnifeIdleLeft": knife_idle_left,
-                "KnifeIdleRight": knife_idle_right,
-             },
-            loop=True
-        )
-        hand_sprite.add_animation(
-            {
-                "GunFireLeft": gun_fire_left,
-                "GunFireRight": gun_fire_right,
-                "BreadFireRight": bread_fire_right,
-                "BreadFireLeft": bread_fire_left,
-                "ShurikenFireRight": shuriken_fire_right,
-                "ShurikenFireLeft": shuriken_fire_left,
-                "FireFireRight": fire_fire_right,
-                "FireFireLeft": fire_fire_left,
-            },
-            loop=False
-        )
-        hand_sprite.add_animation(
-            {
-                "GatlingFireRight": gatling_fire_right,
-                "GatlingFireLeft": gatling_fire_left,
-            },
-            fps_override=24,
-            loop=True
-        )
-        hand_sprite.add_animation({"KnifeFireRight": knife_fire_right,
-                "KnifeFireLeft": knife_fire_left},
-                                  loop=False,
-                                  fps_override=24)
-        hand_sprite.add_callback("GunFireRight",self.finish_firing)
-        hand_sprite.add_callback("GunFireLeft", self.finish_firing)
-        hand_sprite.add_callback("BreadFireRight",self.finish_firing)
-        hand_sprite.add_callback("BreadFireLeft", self.finish_firing)
-        hand_sprite.add_callback("ShurikenFireRight",self.finish_firing)
-        hand_sprite.add_callback("ShurikenFireLeft", self.finish_firing)
-        hand_sprite.add_callback("FireFireRight", self.finish_firing)
-        hand_sprite.add_callback("FireFireLeft", self.finish_firing)
-        hand_sprite.add_callback("GatlingFireRight", self.finish_firing)
-        hand_sprite.add_callback("GatlingFireLeft", self.finish_firing)
-        hand_sprite.add_callback("KnifeFireLeft", self.finish_firing)
-        hand_sprite.add_callback("KnifeFireRight", self.finish_firing)
-        hand_sprite.start_animation("GunIdleRight")
-
-        self.fire_sprite = Sprite(12)
-        fire = Player.get_animation("flame.png", (14, 1), 4)
-        fire_vanish = Player.get_animation("flame.png", (14, 1), 14, start_frame=2)
-        self.fire_sprite.add_animation({
-            "Idle": fire,
-            "Vanish": fire_vanish,
-        }, loop=False)
-        self.fire_sprite.chain_animation("Idle", "Idle")
-        self.fire_sprite.start_animation("Idle", restart_if_active=True)
-
-        self.knife_sound = SoundManager.load("assets/sounds/Knife-2.mp3")
-        self.knife_sound.set_volume(0.3)
+        # Weapons' animations and sounds are only loaded once they are used
+        self.equipped = set()
+        self.weapon_sounds = {}
+        # Weapons handed to WEAPON_PREFETCHER already
+        self.prefetched = set()
+        self.equip(STARTING_WEAPON)
+        hand_sprite.start_animation(f"{WEAPONS[STARTING_WEAPON].name}IdleRight")
+
+    def equip(self, mode):
+        """ Adds a weapon's animations to the hand sprite and loads its sounds, unless it's been used already """
+        if mode in self.equipped:
+            return
+        weapon = WEAPONS[mode]
+        idle, fire, other, sounds = weapon.load()
+        self.hand_sprite.add_animation(idle, loop=True)
+        self.hand_sprite.add_animation(fire, fps_override=weapon.fire_fps, loop=weapon.fire_loop)
+        for animation in {**idle, **fire}.values():
+            animation.cache_rotations(c.ROTATION_CACHE_STEP)
+        for name in fire:
+            self.hand_sprite.add_callback(name, self.finish_firing)
+        for sound in sounds:
+            sound.set_volume(weapon.volume)
+        self.weapon_sounds[mode] = sounds
+
+        if mode == c.FIRE:
+            self.fire_sprite = Sprite(12)
+            self.fire_sprite.add_animation(other, loop=False)
+            self.fire_sprite.chain_animation("Idle", "Idle")
+            self.fire_sprite.start_animation("Idle", restart_if_active=True)
+        self.equipped.add(mode)
+
+    def switch_weapon(self, mode):
+        self.equip(mode)
+        self.weapon_mode = mode
+
+    def prefetch_weapons(self, modes):
+        """ Loads the weapons' assets on a worker thread, so switching to one of them doesn't stall """
+        for mode in modes:
+            if mode not in self.equipped and mode not in self.prefetched:
+                self.prefetched.add(mode)
+                # If loading fails, equip loads it again and fails where it can be seen
+                WEAPON_PREFETCHER.submit(WEAPONS[mode].load)
 
     def update_hand(self, dt, events):
-        mpos = pygame.mouse.get_pos()
+        mpos = Controls.get_mouse_pos()
         aim_position = Camera.screen_to_world(mpos)
         relative = aim_position - self.position
         relative.scale_to(70)
@@ -526,7 +547,7 @@ class Player:
 
         self.last_fire = 0
         self.firing = True
-        mpos = pygame.mouse.get_pos()
+        mpos = Controls.get_mouse_pos()
         relative = Camera.screen_to_world(mpos) - self.position
 
         self.aim_angle = relative.get_angle_of_position_degrees()
@@ -543,7 +564,7 @@ class Player:
                 self.hand_sprite.start_animation("GunFireRight")
             self.frame.particles.append(MuzzleFlash(offset.get_position(), self.arm_angle))
             self.frame.projectiles.append(PistolBullet(offset.get_position(), relative.get_position(), self.frame))
-            random.choice(self.pistols).play()
+            VoiceManager.play(random.choice(self.weapon_sounds[c.GUN]))
             knockback = relative * -1
             knockback.scale_to(500)
             self.frame.shake(direction=relative, amt=15)
@@ -557,7 +578,7 @@ class Player:
             else:
                 self.hand_sprite.start_animation("BreadFireRight")
             self.frame.projectiles.append(Bread(offset.get_position(), relative.get_position(), self.frame))
-            random.choice(self.breads).play()
+            VoiceManager.play(random.choice(self.weapon_sounds[c.BREAD]))
         elif self.weapon_mode == c.GATLING:
             self.knockback_velocity = 200
             if relative.x < 0:
@@ -574,7 +595,7 @@ class Player:
             
             self.frame.particles.append(MuzzleFlash(muzzle_offset.get_position(), self.arm_angle, duration=0.03))
             bullet = PistolBullet(bullet_offset.get_position(), relative.get_position(), self.frame)
-            random.choice(self.shots).play()
+            VoiceManager.play(random.choice(self.weapon_sounds[c.GATLING]))
             bullet.damage = 40
             self.frame.projectiles.append(bullet)
             knockback = relative * -1
@@ -600,7 +621,7 @@ class Player:
                 self.frame.projectiles.append(Shuriken(offset.get_position(), new_relative.get_position(), self.frame))
             knockback = relative * -1
             knockback.scale_to(500)
-            random.choice(self.shurikens).play()
+            VoiceManager.play(random.choice(self.weapon_sounds[c.SHURIKEN]))
         elif self.weapon_mode == c.FIRE:
             self.knockback_velocity = 0
             if relative.x < 0:
@@ -625,7 +646,7 @@ class Player:
                         for i in range(16):
                             pos = enemy.position * 0.7 + self.position * 0.3
                             self.frame.particles.append(SparkParticle(pos.get_position(), duration=0.2, color=(255, 255, 255), velocity_scale=1.5))
-            self.knife_sound.play()
+            VoiceManager.play(self.weapon_sounds[c.KNIFE][0])
 
         self.velocity += knockback
 
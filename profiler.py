@@ -0,0 +1,142 @@
+import pygame
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Profiler:
+    """
+    Static class that times named sections of the game loop and keeps a rolling history of them.
+    Measuring costs nothing while disabled.
+    """
+
+    enabled = False
+    history_length = 60
+    current = {}
+    history = {}
+    frame_times = deque(maxlen=history_length)
+
+    @classmethod
+    def init(cls, enabled=False, history_length=60):
+        cls.enabled = enabled
+        cls.history_length = history_length
+        cls.current = {}
+        cls.history = {}
+        cls.frame_times = deque(maxlen=history_length)
+
+    @classmethod
+    @contextmanager
+    def measure(cls, name):
+        """
+        Adds the time spent inside the with block to the section called name. Sections measured
+        several times in a frame are summed.
+        """
+        if not cls.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.current[name] = cls.current.get(name, 0) + time.perf_counter() - start
+
+    @classmethod
+    def end_frame(cls, dt):
+        """ Closes the current frame, dt being its total duration in seconds """
+        if not cls.enabled:
+            return
+        cls.frame_times.append(dt)
+        for name in cls.current:
+            if name not in cls.history:
+                cls.history[name] = deque(maxlen=cls.history_length)
+        for name, times in cls.history.items():
+            times.append(cls.current.get(name, 0))
+        cls.current = {}
+
+    @classmethod
+    def average(cls, name):
+        """ Rolling average of a section, in seconds """
+        times = cls.history.get(name)
+        if not times:
+            return 0
+        return sum(times)/len(times)
+
+    @classmethod
+    def average_frame_time(cls):
+        if not cls.frame_times:
+            return 0
+        return sum(cls.frame_times)/len(cls.frame_times)
+
+
+class PerformanceOverlay:
+    """
+    Text overlay with the rolling frame time, the time spent in each profiled section and the size
+    of the frame's entity lists. Drawn on top of everything else.
+    """
+
+    SECTIONS = [
+        ("update", "Update"),
+        ("enemy_update", "  Enemies"),
+        ("projectile_update", "  Projectiles"),
+        ("particle_update", "  Particles"),
+        ("collisions", "  Collisions"),
+        ("draw", "Draw"),
+        ("background_draw", "  Background"),
+        ("player_draw", "  Player"),
+        ("enemy_draw", "  Enemies"),
+        ("projectile_draw", "  Projectiles"),
+        ("particle_draw", "  Particles"),
+        ("healthbar_draw", "  Health bar"),
+        ("flash_draw", "  Flashes"),
+    ]
+    POSITION = (20, 120)
+    LINE_HEIGHT = 22
+    TEXT_COLOR = (255, 255, 255)
+    BACKGROUND_ALPHA = 160
+
+    def __init__(self):
+        self.visible = False
+        self.font = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        Profiler.enabled = self.visible
+
+    def lines(self, frame):
+        frame_time = Profiler.average_frame_time()
+        fps = 1/frame_time if frame_time else 0
+        lines = [f"Frame {frame_time*1000:6.2f} ms  ({fps:.0f} fps)"]
+        for name, label in self.SECTIONS:
+            if name in Profiler.history:
+                lines.append(f"{label:<14}{Profiler.average(name)*1000:6.2f} ms")
+
+        for name in ("enemies", "projectiles", "particles"):
+            entities = getattr(frame, name, None)
+            if entities is None:
+                continue
+            if hasattr(entities, "count_by_kind"):
+                kinds = entities.count_by_kind()
+            else:
+                kinds = {}
+                for entity in entities:
+                    kind = type(entity).__name__
+                    kinds[kind] = kinds.get(kind, 0) + 1
+            detail = ", ".join(f"{kind} {count}" for kind, count in sorted(kinds.items()))
+            lines.append(f"{name.capitalize():<14}{len(entities):6}  {detail}")
+        return lines
+
+    def draw(self, surface, frame):
+        if not self.visible:
+            return
+        if not self.font:
+            self.font = pygame.font.Font(None, 26)
+        rendered = [self.font.render(line, True, self.TEXT_COLOR) for line in self.lines(frame)]
+        width = max(text.get_width() for text in rendered) + 20
+        height = len(rendered) * self.LINE_HEIGHT + 20
+        back = pygame.Surface((width, height))
+        back.fill((0, 0, 0))
+        back.set_alpha(self.BACKGROUND_ALPHA)
+        x, y = self.POSITION
+        surface.blit(back, (x, y))
+        for i, text in enumerate(rendered):
+            surface.blit(text, (x + 10, y + 10 + i * self.LINE_HEIGHT))
@@ -1,17 +1,17 @@
 from primitives import Pose
-import pygame
 import math
 import random
 import constants as c
 
-from pyracy.sprite_tools import Sprite, Animation
+from pyracy.sprite_tools import Sprite
+from animation_manager import AnimationManager
 from particle import Puff, SparkParticle, Casing
+from transform_cache import TransformCache
+from voice_manager import VoiceManager
 
 
 class Projectile:
 
-    surf_cache = {}
-
     def __init__(self, position, velocity):
         self.position = Pose(position)
         self.velocity = Pose(velocity)
@@ -21,20 +21,21 @@ class Projectile:
         self.damage = 60
         self.slowdown = 1.0
         self.z = 0
+        # Whether it's lying on the ground, drawn under enemies instead of over them
+        self.landed = False
+        # Where the projectile was at the start of the last update, to test its whole path for hits
+        self.previous_position = self.position.copy()
+        self.previous_z = self.z
 
     def update(self, dt, events):
+        self.previous_position = self.position.copy()
+        self.previous_z = self.z
         self.position += self.velocity * dt
         self.age += dt
 
     def draw(self, surface, offset=(0, 0)):
         pass
 
-    @classmethod
-    def load_surf(cls, path):
-        if not path in cls.surf_cache:
-            cls.surf_cache[path] = pygame.image.load(path)
-        return cls.surf_cache[path]
-
     def on_impact(self):
         pass
 
@@ -68,8 +69,7 @@ class PistolBullet(Projectile):
         angle += random.random() * self.random_angle_factor - self.angle_constant
         self.velocity = Pose((math.cos(angle), -math.sin(angle)))
         self.velocity.scale_to(4000)
-        self.surf = self.load_surf("assets/images/bullet.png")
-        anim = Animation(self.surf, self.sheet_size, self.number_of_frames)
+        anim = AnimationManager.load("assets/images/bullet.png", self.sheet_size, self.number_of_frames)
         self.sprite = Sprite(self.sprite_fps, self.position.get_position())
         self.sprite.add_animation({"Bullet": anim}, loop=True)
         self.sprite.start_animation("Bullet")
@@ -127,8 +127,9 @@ class Bread(Projectile):
         angle += random.random() * self.random_angle_factor - self.angle_constant
         self.velocity = Pose((math.cos(angle), -math.sin(angle)))
         self.velocity.scale_to(600)
-        self.surf = self.load_surf("assets/images/bread.png")
-        anim = Animation(self.surf, self.sheet_size, self.number_of_frames)
+        anim = AnimationManager.load("assets/images/bread.png", self.sheet_size, self.number_of_frames)
+        anim.cache_rotations(c.ROTATION_CACHE_STEP)
+        self.frame_surf = anim.frames[0]
         self.sprite = Sprite(self.sprite_fps, self.position.get_position())
         self.sprite.add_animation({"Bread": anim}, loop=True)
         self.sprite.start_animation("Bread")
@@ -159,7 +160,7 @@ class Bread(Projectile):
                 for i in range(self.particles_number):
                     self.frame.particles.append(Puff((self.position + Pose((0, -20))).get_position()))
                 self.landed = True
-                random.choice(self.frame.player.breads).play()
+                VoiceManager.play(random.choice(self.frame.player.weapon_sounds[c.BREAD]))
             self.spin_speed = 0
             self.angle = self.updated_angle
 
@@ -172,15 +173,16 @@ class Bread(Projectile):
         self.bounced = True
         self.velocity *= -self.bounce_velocity_factor
         self.zvel = self.bounce_zvel
-        random.choice(self.frame.player.breads).play()
+        VoiceManager.play(random.choice(self.frame.player.weapon_sounds[c.BREAD]))
 
     def draw(self, surface, offset=(0, 0)):
-        img = self.sprite.get_image()
         if self.age > self.age_limit_for_size:
             scale = 1 - ((self.age - self.age_limit_for_size) * self.scale_shrink_rate)
             if scale < 0:
                 return
-            img = pygame.transform.scale(img, (int(img.get_width() * scale), int(img.get_height() * scale)))
+            img = TransformCache.get(self.frame_surf, scale, self.sprite.angle)
+        else:
+            img = self.sprite.get_image()
 
         x = self.position.x - img.get_width()//2 - offset[0]
         y = self.position.y + self.z - img.get_height()//2 - offset[1]
@@ -208,8 +210,8 @@ class Shuriken(Projectile):
         angle = self.velocity.get_angle_of_position()
         self.velocity = Pose((math.cos(angle), -math.sin(angle)))
         self.velocity.scale_to(2000)
-        self.surf = self.load_surf("assets/images/shuriken.png")
-        anim = Animation(self.surf, self.sheet_size, self.number_of_frames)
+        anim = AnimationManager.load("assets/images/shuriken.png", self.sheet_size, self.number_of_frames)
+        anim.cache_rotations(c.ROTATION_CACHE_STEP)
         self.sprite = Sprite(12, self.position.get_position())
         self.sprite.add_animation({"Bullet": anim}, loop=True)
         self.sprite.start_animation("Bullet")
@@ -226,6 +228,8 @@ class Shuriken(Projectile):
         x = self.position.x
         y = self.position.y
         self.sprite.set_position((x, y))
+        # Rotated frames are shared between shurikens, so the alpha has to be set right before drawing
+        self.sprite.image.set_alpha(self.alpha)
         self.sprite.draw(surface, offset)
 
     def update(self, dt, events):
@@ -237,7 +241,6 @@ class Shuriken(Projectile):
             self.spin_speed *= self.spin_speed_decay**dt
             self.alpha -= self.alpha_subtracting_factor*dt
         self.sprite.set_angle(self.angle)
-        self.sprite.image.set_alpha(self.alpha)
         if self.alpha < 0:
             self.destroyed = True
 
@@ -39,6 +39,10 @@ class Animation(object):
         self.frames = self.split(surface, sheet_size, frame_count, rect, scale)[start_frame:]
         self.frame_count -= start_frame
 
+        #   Rotated frames are only cached once cache_rotations is called
+        self.rotation_step = None
+        self.rotated_frames = {}
+
     @staticmethod
     def from_path(path, *args, **kwargs):
         """
@@ -46,6 +50,28 @@ class Animation(object):
         """
         return Animation(pygame.image.load(path), *args, **kwargs)
 
+    @staticmethod
+    def from_frames(frames, reverse_x=False, reverse_y=False, reverse_animation=False, colorkey=None, scale=1.0):
+        """
+        Initializes an Animation from frames that were already split, flipped and scaled, for instance
+        by an earlier Animation. The other arguments only record how the frames were made.
+        """
+        animation = Animation.__new__(Animation)
+        animation.surface = None
+        animation.reverse_x = reverse_x
+        animation.reverse_y = reverse_y
+        animation.reverse_animation = reverse_animation
+        animation.frame_count = len(frames)
+        animation.colorkey = colorkey
+        animation.scale = scale
+        animation.frames = list(frames)
+        if colorkey:
+            for frame in animation.frames:
+                frame.set_colorkey(colorkey)
+        animation.rotation_step = None
+        animation.rotated_frames = {}
+        return animation
+
     def split(self, surface, sheet_size, frame_count, rect=None, scale=1.0):
         """
         Breaks up the source image into a list of frames.
@@ -106,6 +132,35 @@ class Animation(object):
 
         return frames
 
+    def cache_rotations(self, step=2):
+        """
+        Makes get_rotated round angles to the nearest multiple of step and keep every rotated frame
+        it makes, so each frame is only rotated once per angle bucket. Every Sprite using this
+        Animation shares the cache, which is filled as angles come up rather than up front.
+
+        step (default 2): size of the angle buckets in degrees
+        """
+        if step == self.rotation_step:
+            return
+        self.rotation_step = step
+        self.rotated_frames = {}
+
+    def get_rotated(self, frame_number, angle):
+        """
+        Returns a frame rotated counterclockwise by angle degrees. If rotations are cached, the
+        returned surface is shared, so don't draw on it.
+
+        frame_number: index of the frame in self.frames
+        angle: rotation in degrees
+        """
+        if not self.rotation_step:
+            return pygame.transform.rotate(self.frames[frame_number], angle)
+        bucket = round(angle/self.rotation_step) % round(360/self.rotation_step)
+        key = frame_number, bucket
+        if key not in self.rotated_frames:
+            self.rotated_frames[key] = pygame.transform.rotate(self.frames[frame_number], bucket*self.rotation_step)
+        return self.rotated_frames[key]
+
     def reverse(self, x_bool, y_bool):
         """
         Reverses the frames of the animation based on which booleans are True.
@@ -117,6 +172,7 @@ class Animation(object):
         #   Flip each frame
         for idx, frame in enumerate(self.frames):
             self.frames[idx] = pygame.transform.flip(frame, x_bool, y_bool)
+        self.rotated_frames = {}
 
 
 class Sprite(pygame.sprite.Sprite):
@@ -215,10 +271,9 @@ class Sprite(pygame.sprite.Sprite):
             # Yes, this is lazy, but should only break in ways it would have broken anyways with a while loop
             return self.get_image()
 
-        image = active_animation.frames[frame_number]
         if self.angle != 0:
-            image = pygame.transform.rotate(image, self.angle)
-        return image
+            return active_animation.get_rotated(frame_number, self.angle)
+        return active_animation.frames[frame_number]
 
     def update_image(self):
         self.image = self.get_image()
@@ -0,0 +1,70 @@
+class RenderQueue:
+    """
+    Collects what a frame draws as commands on layers, then draws each layer with one
+    Surface.blits call. Entities draw on it as they would on a surface. Set the layer before drawing
+    each one. Within a layer, commands are drawn in the order they were queued, so queue entities
+    that overlap from back to front.
+
+    Surfaces' alphas are remembered when they're queued, so a surface whose alpha is changed between
+    blits, like those from TransformCache, still draws with the alpha it had each time.
+    """
+
+    def __init__(self, layer_count):
+        """
+        :param layer_count: Number of layers. They're drawn from 0 up.
+        """
+        self.layer_count = layer_count
+        self.clear()
+
+    def clear(self, layer=None):
+        """ Forgets what's queued on layer, or on every layer if it's None """
+        if layer is None:
+            self.commands = [[] for _ in range(self.layer_count)]
+            self.alphas = [[] for _ in range(self.layer_count)]
+            self.layer = 0
+            return
+        self.commands[layer] = []
+        self.alphas[layer] = []
+
+    def set_layer(self, layer):
+        """ Sets the layer of what's drawn next """
+        self.layer = layer
+
+    def queue(self, command, alpha):
+        self.commands[self.layer].append(command)
+        self.alphas[self.layer].append(alpha)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        self.queue((source, dest, area, special_flags), source.get_alpha())
+
+    def polygon(self, color, points):
+        """ Queues a filled polygon like pygame.draw.polygon """
+        self.queue(lambda target: target.polygon(color, points), None)
+
+    def flush(self, target, layer=None):
+        """
+        Draws what's queued on target, a RenderTarget, and forgets it
+        :param layer: The layer to draw, or None to draw all of them in order
+        """
+        layers = range(self.layer_count) if layer is None else [layer]
+        for layer in layers:
+            commands, alphas = self.commands[layer], self.alphas[layer]
+            batch = []
+            for command, alpha in zip(commands, alphas):
+                if callable(command):
+                    if batch:
+                        target.blits(batch, False)
+                        batch = []
+                    command(target)
+                    continue
+                source = command[0]
+                if source.get_alpha() != alpha:
+                    # Blit the earlier uses of source with their alpha first
+                    if batch:
+                        target.blits(batch, False)
+                        batch = []
+                    source.set_alpha(alpha)
+                batch.append(command)
+            if batch:
+                target.blits(batch, False)
+            self.clear(layer)
@@ -0,0 +1,112 @@
+import weakref
+import pygame
+
+
+class RenderTarget:
+    """
+    What frames draw on. It takes blits and fills in screen coordinates, the size of the display,
+    but can render them to an offscreen surface a fraction of that size. present() then scales the
+    frame up to the display once. Fewer pixels are blended per blit, which is where the time goes
+    on machines short on fill rate.
+
+    Sources are scaled down the first time they're blitted and kept for as long as they live, so
+    don't draw on a surface once it's been blitted here. Setting its alpha is fine.
+    """
+
+    def __init__(self, display, scale=1.0, smooth=False):
+        """
+        :param display: The display surface
+        :param scale: Size of the rendered frame relative to the display, like 0.5 for half
+        :param smooth: Whether to upscale with smoothscale, rather than keeping pixels square
+        """
+        self.display = display
+        self.scale = scale
+        self.smooth = smooth
+        if scale == 1:
+            # Draw straight on the display
+            self.surface = display
+            self.blit = display.blit
+            self.blits = display.blits
+            self.fill = display.fill
+        else:
+            size = max(1, round(display.get_width() * scale)), max(1, round(display.get_height() * scale))
+            self.surface = pygame.Surface(size, 0, display)
+        self.scaled = weakref.WeakKeyDictionary()
+        self.solid = None
+        self.solid_color = None
+
+    def get_size(self):
+        return self.display.get_size()
+
+    def get_width(self):
+        return self.display.get_width()
+
+    def get_height(self):
+        return self.display.get_height()
+
+    def to_surface(self, rect):
+        """ :return: rect, in screen coordinates, on the offscreen surface """
+        return pygame.Rect(rect[0] * self.scale, rect[1] * self.scale,
+                           round(rect[2] * self.scale), round(rect[3] * self.scale))
+
+    def source(self, surface):
+        """ :return: surface, scaled down to be blitted to the offscreen surface """
+        scaled = self.scaled.get(surface)
+        if scaled is None:
+            size = max(1, round(surface.get_width() * self.scale)), max(1, round(surface.get_height() * self.scale))
+            scaled = pygame.transform.scale(surface, size)
+            self.scaled[surface] = scaled
+        elif scaled.get_alpha() != surface.get_alpha():
+            scaled.set_alpha(surface.get_alpha())
+        return scaled
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        dest = dest[0] * self.scale, dest[1] * self.scale
+        if area is not None:
+            area = self.to_surface(area)
+        return self.surface.blit(self.source(source), dest, area, special_flags)
+
+    def blits(self, blit_sequence, doreturn=True):
+        """ Blits each (source, dest, area, special_flags) in blit_sequence, like Surface.blits """
+        scale = self.scale
+        return self.surface.blits([(self.source(source), (dest[0] * scale, dest[1] * scale),
+                                    area if area is None else self.to_surface(area), special_flags)
+                                   for source, dest, area, special_flags in blit_sequence], doreturn)
+
+    def fill(self, color, rect=None, special_flags=0):
+        if rect is not None:
+            rect = self.to_surface(rect)
+        return self.surface.fill(color, rect, special_flags)
+
+    def blend(self, color, alpha):
+        """
+        Blends a solid color over the whole frame
+        :param alpha: How opaque the color is, from 0 to 1
+        """
+        color = [min(round(channel), 255) for channel in color]
+        alpha = int(alpha * 255 + 1e-6)
+        if alpha >= 255:
+            self.surface.fill(color)
+            return
+        if self.solid is None:
+            self.solid = pygame.Surface(self.surface.get_size(), 0, self.surface)
+        if color != self.solid_color:
+            self.solid.fill(color)
+            self.solid_color = color
+        self.solid.set_alpha(alpha)
+        self.surface.blit(self.solid, (0, 0))
+
+    def polygon(self, color, points):
+        """ Draws a filled polygon like pygame.draw.polygon """
+        if self.scale != 1:
+            points = [(x * self.scale, y * self.scale) for x, y in points]
+        return pygame.draw.polygon(self.surface, color, points)
+
+    def present(self):
+        """ Scales the frame up to the display. Call once it's drawn, before drawing anything at full size. """
+        if self.surface is self.display:
+            return
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, self.display.get_size(), self.display)
+        else:
+            pygame.transform.scale(self.surface, self.display.get_size(), self.display)
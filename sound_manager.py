@@ -1,18 +1,63 @@
+import os
+import json
+import time
+import struct
+import hashlib
 import pygame
+import weakref
+import threading
+from collections import OrderedDict
+
+# Size of the JSON description that starts each cached file, before the samples
+HEADER = struct.Struct("<I")
 
 
 class SoundManager:
     """
-    Static class to handle loading of pygame surfaces to improve performance
+    Static class to handle loading of pygame surfaces to improve performance. Decoded samples can be
+    cached on disk, so later sessions skip decoding the mp3 and ogg files.
+
+    Once the sounds in memory add up to more than the budget, the least recently loaded or played
+    ones are forgotten, except pinned ones and ones that are playing. Forgotten sounds are only
+    weakly referenced until whatever else holds them lets go, so loading one that's still held gets
+    it back instead of decoding a second copy.
     """
 
+    lock = threading.Lock()
     initialized = False
     sounds = None
+    released = None
+    paths = None
+    pinned = None
+    budget = None
+    total_bytes = 0
+    hits = 0
+    misses = 0
+    cache_directory = None
+    cache_paths = None
+    decode_times = None
 
     @staticmethod
-    def init():
+    def init(cache_directory=None, budget=None):
+        """
+        :param cache_directory: Where to keep decoded samples between sessions. None decodes every time.
+        :param budget: Maximum number of bytes of samples to keep. None means no limit.
+        """
         SoundManager.initialized = True
-        SoundManager.sounds = {}
+        SoundManager.sounds = OrderedDict()
+        # Sounds forgotten over the budget, by path, for as long as something else holds them
+        SoundManager.released = weakref.WeakValueDictionary()
+        # Outlives the cache for sounds still in use, so VoiceManager can tell what they are
+        SoundManager.paths = weakref.WeakKeyDictionary()
+        SoundManager.pinned = set()
+        SoundManager.budget = budget
+        SoundManager.total_bytes = 0
+        SoundManager.hits = 0
+        SoundManager.misses = 0
+        SoundManager.cache_directory = cache_directory
+        # path: (mtime, cache path), so each file is only hashed again once it changes
+        SoundManager.cache_paths = {}
+        SoundManager.decode_times = {}
 
     @staticmethod
     def check_initialized():
@@ -28,7 +73,9 @@ class SoundManager:
         """
         SoundManager.check_initialized()
         if path in SoundManager.sounds:
-            del SoundManager.sounds[path]
+            SoundManager.total_bytes -= SoundManager.sound_bytes(SoundManager.sounds.pop(path))
+        SoundManager.released.pop(path, None)
+        SoundManager.pinned.discard(path)
 
     @staticmethod
     def clear_all():
@@ -36,7 +83,10 @@ class SoundManager:
         Forgets everything
         """
         SoundManager.check_initialized()
-        SoundManager.sounds = {}
+        SoundManager.sounds = OrderedDict()
+        SoundManager.released = weakref.WeakValueDictionary()
+        SoundManager.pinned = set()
+        SoundManager.total_bytes = 0
 
     @staticmethod
     def load(path):
@@ -46,8 +96,200 @@ class SoundManager:
         :return: The surface. This is likely the same reference others are using, so don't be destructive.
         """
         SoundManager.check_initialized()
-        if path in SoundManager.sounds:
-            return SoundManager.sounds[path]
-        sound = pygame.mixer.Sound(path)
+        with SoundManager.lock:
+            if path in SoundManager.sounds:
+                SoundManager.hits += 1
+                SoundManager.sounds.move_to_end(path)
+                return SoundManager.sounds[path]
+            sound = SoundManager.released.pop(path, None)
+            if sound is not None:
+                SoundManager.hits += 1
+                return SoundManager.store(path, sound)
+            SoundManager.misses += 1
+            cache_path = SoundManager.cache_path(path)
+            sound = SoundManager.read_cache(path, cache_path)
+            if sound is None:
+                start = time.perf_counter()
+                sound = pygame.mixer.Sound(path)
+                SoundManager.decode_times[path] = time.perf_counter() - start
+                SoundManager.write_cache(path, sound, cache_path)
+            return SoundManager.store(path, sound)
+
+    @staticmethod
+    def add(path, sound, decode_time=None):
+        """
+        Caches a sound that was decoded somewhere else, as if it had been loaded from path
+        :param decode_time: How long decoding it took, in seconds
+        """
+        SoundManager.check_initialized()
+        with SoundManager.lock:
+            if path in SoundManager.sounds:
+                return
+            # A forgotten copy that's still held stays the one in use
+            held = SoundManager.released.pop(path, None)
+            if held is not None:
+                SoundManager.store(path, held)
+                return
+            if decode_time is not None:
+                SoundManager.decode_times[path] = decode_time
+                SoundManager.write_cache(path, sound)
+            SoundManager.store(path, sound)
+
+    @staticmethod
+    def store(path, sound):
         SoundManager.sounds[path] = sound
+        SoundManager.paths[sound] = path
+        SoundManager.total_bytes += SoundManager.sound_bytes(sound)
+        SoundManager.enforce_budget(keep=path)
+        return sound
+
+    @staticmethod
+    def touch(sound):
+        """ Marks a sound as just used, so it's forgotten last. Call when it's played. """
+        SoundManager.check_initialized()
+        with SoundManager.lock:
+            path = SoundManager.paths.get(sound)
+            if path in SoundManager.sounds:
+                SoundManager.sounds.move_to_end(path)
+
+    @staticmethod
+    def sound_bytes(sound):
+        """ Size of a sound's samples, worked out without copying them like get_raw does """
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return round(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+    @staticmethod
+    def enforce_budget(keep=None):
+        """
+        Forgets least recently used sounds until the total fits the budget, or only ones that must stay are left
+        :param keep: Path of a sound to keep too, like the one just loaded
+        """
+        if SoundManager.budget is None:
+            return
+        for path in list(SoundManager.sounds):
+            if SoundManager.total_bytes <= SoundManager.budget:
+                return
+            sound = SoundManager.sounds[path]
+            if path == keep or path in SoundManager.pinned or sound.get_num_channels():
+                continue
+            del SoundManager.sounds[path]
+            SoundManager.released[path] = sound
+            SoundManager.total_bytes -= SoundManager.sound_bytes(sound)
+
+    @staticmethod
+    def pin(path):
+        """
+        Loads a sound and keeps it in memory whatever the budget, until it's unpinned or cleared
+        :return: The sound
+        """
+        sound = SoundManager.load(path)
+        SoundManager.pinned.add(path)
         return sound
+
+    @staticmethod
+    def unpin(path):
+        SoundManager.check_initialized()
+        SoundManager.pinned.discard(path)
+
+    @staticmethod
+    def stats():
+        """ :return: Counts of sounds, bytes, hits and misses, for reports """
+        SoundManager.check_initialized()
+        return {
+            "sounds": len(SoundManager.sounds),
+            "pinned": len(SoundManager.pinned),
+            "bytes": SoundManager.total_bytes,
+            "budget": SoundManager.budget,
+            "hits": SoundManager.hits,
+            "misses": SoundManager.misses,
+        }
+
+    @staticmethod
+    def path_of(sound):
+        """ :return: The path a sound was loaded from, or None if it wasn't loaded here """
+        return SoundManager.paths.get(sound)
+
+    @staticmethod
+    def cache_path(path):
+        """
+        Where the decoded samples of path are cached. They're keyed by its contents and the mixer's format.
+        :return: The path of the cached samples, or None if nothing is cached
+        """
+        if SoundManager.cache_directory is None:
+            return None
+        mtime = os.path.getmtime(path)
+        known = SoundManager.cache_paths.get(path)
+        if known is not None and known[0] == mtime:
+            return known[1]
+        with open(path, "rb") as file:
+            digest = hashlib.sha1(file.read())
+        digest.update(repr(pygame.mixer.get_init()).encode())
+        cache_path = os.path.join(SoundManager.cache_directory, digest.hexdigest() + ".pcm")
+        SoundManager.cache_paths[path] = mtime, cache_path
+        return cache_path
+
+    @staticmethod
+    def is_cached(path):
+        """ Whether loading path would find its samples on disk instead of decoding them """
+        SoundManager.check_initialized()
+        cache_path = SoundManager.cache_path(path)
+        return cache_path is not None and os.path.exists(cache_path)
+
+    @staticmethod
+    def read_cache(path, cache_path=None):
+        """
+        :param cache_path: cache_path(path), if it's already known
+        :return: The sound made from samples cached on disk, or None if there are none
+        """
+        if cache_path is None:
+            cache_path = SoundManager.cache_path(path)
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, "rb") as file:
+                data = file.read()
+            (description_size,) = HEADER.unpack_from(data)
+            description = json.loads(data[HEADER.size:HEADER.size + description_size])
+            samples = data[HEADER.size + description_size:]
+            # A sound made from samples cut short would just play cut short
+            if len(samples) != description["bytes"]:
+                raise ValueError(f"{len(samples)} bytes of samples instead of {description['bytes']}")
+            sound = pygame.mixer.Sound(buffer=samples)
+        except (OSError, ValueError, KeyError, TypeError, struct.error, pygame.error) as e:
+            # Deleted, so it's decoded and cached again
+            print(f"Ignoring unreadable cached sound {cache_path}: {e}")
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+        SoundManager.decode_times[path] = description["decode_time"]
+        return sound
+
+    @staticmethod
+    def write_cache(path, sound, cache_path=None):
+        if cache_path is None:
+            cache_path = SoundManager.cache_path(path)
+        if cache_path is None:
+            return
+        samples = sound.get_raw()
+        description = json.dumps({"path": path, "decode_time": SoundManager.decode_times[path],
+                                  "bytes": len(samples)}).encode()
+        try:
+            os.makedirs(SoundManager.cache_directory, exist_ok=True)
+            with open(cache_path + ".tmp", "wb") as file:
+                file.write(HEADER.pack(len(description)))
+                file.write(description)
+                file.write(samples)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError as e:
+            print(f"Error caching decoded sound: {e}")
+
+    @staticmethod
+    def decode_report():
+        """
+        :return: (path, seconds) of every sound loaded so far, slowest to decode first. Sounds read
+            from the cache report how long decoding took when they were cached.
+        """
+        SoundManager.check_initialized()
+        return sorted(SoundManager.decode_times.items(), key=lambda item: -item[1])
@@ -0,0 +1,96 @@
+import math
+
+
+class SpatialHash:
+    """
+    Uniform grid that buckets points by the cell they fall in, so that everything near a position
+    can be found without looking at every point.
+    """
+
+    def __init__(self, cell_size=200):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells = {}
+
+    def cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, key, x, y):
+        """
+        Adds a point to the grid.
+        :param key: What query returns for this point. Keys must be sortable, e.g. list indices
+        """
+        cell = self.cell(x, y)
+        if cell in self.cells:
+            self.cells[cell].append(key)
+        else:
+            self.cells[cell] = [key]
+
+    def query(self, x, y, radius):
+        """
+        Finds the points that may lie within radius of (x, y). Every point that does is returned,
+        along with some that don't, so callers still need an exact test.
+        :return: The keys of the candidate points, sorted
+        """
+        min_x, min_y = self.cell(x - radius, y - radius)
+        max_x, max_y = self.cell(x + radius, y + radius)
+        found = []
+        cells = self.cells
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                keys = cells.get((cell_x, cell_y))
+                if keys:
+                    found.extend(keys)
+        found.sort()
+        return found
+
+
+def overlapping_pairs(intervals):
+    """
+    Sort and sweep: finds which of a list of (start, end) intervals overlap each other.
+    Sorting by start means each interval only has to be compared with the ones still open when it
+    begins, instead of with every other interval.
+    :param intervals: List of (start, end) tuples
+    :return: Sorted list of index pairs (i, j), i < j, whose intervals overlap
+    """
+    order = sorted(range(len(intervals)), key=lambda index: intervals[index][0])
+    pairs = []
+    active = []
+    for index in order:
+        start, end = intervals[index]
+        active = [other for other in active if intervals[other][1] >= start]
+        for other in active:
+            pairs.append((other, index) if other < index else (index, other))
+        active.append(index)
+    pairs.sort()
+    return pairs
+
+
+def segment_hit_time(x, y, radius, start_x, start_y, end_x, end_y):
+    """
+    How far along the segment from start to end a point moving along it first comes within radius
+    of (x, y).
+    :return: The fraction of the way along, from 0 to 1, or None if it never does
+    """
+    seg_x = end_x - start_x
+    seg_y = end_y - start_y
+    off_x = start_x - x
+    off_y = start_y - y
+    # Solves |start + t*segment - (x, y)| = radius for the smallest t
+    c = off_x*off_x + off_y*off_y - radius*radius
+    if c < 0:
+        return 0
+    a = seg_x*seg_x + seg_y*seg_y
+    if a == 0:
+        return None
+    b = 2 * (off_x*seg_x + off_y*seg_y)
+    discriminant = b*b - 4*a*c
+    if discriminant <= 0:
+        return None
+    through = (-b - math.sqrt(discriminant)) / (2*a)
+    if 0 <= through <= 1:
+        return through
+    return None
+
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import pygame
+
+MAGIC = b"SSPACK02"
+# Magic, offset of the JSON index and its size. Pixels start at DATA_START, the index follows them
+HEADER = struct.Struct("<8sQI")
+DATA_START = 64
+# Byte order of 32 bit pixels with the display's masks (0xFF0000, 0xFF00, 0xFF, alpha 0xFF000000)
+PIXEL_FORMAT = "BGRA" if sys.byteorder == "little" else "ARGB"
+
+
+class SpritePack:
+    """
+    Static class to read the sprite pack made by bake_sprites.py. The pack holds images and
+    already split and flipped animation frames as pixels in the display's format, so they come out
+    of a memory mapped file instead of being decoded from PNG and split again. Pixels that compress
+    well, like mostly transparent frames, are stored with zlib, which still inflates several times
+    faster than PNGs decode.
+
+    Anything not in the pack, or whose PNG changed since it was baked, is left for the caller to
+    load the usual way.
+    """
+
+    initialized = False
+    data = None
+    index = None
+    fresh = {}
+
+    @staticmethod
+    def init(path):
+        """
+        Opens the pack at path. If there is none, or it doesn't match this machine, nothing is in it.
+        """
+        SpritePack.initialized = True
+        SpritePack.data = None
+        SpritePack.index = {"images": {}, "animations": {}, "sources": {}}
+        SpritePack.fresh = {}
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as file:
+            # Copy on write, so pixels nobody draws on stay shared with the page cache
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, index_offset, index_size = HEADER.unpack_from(data)
+        index = json.loads(bytes(data[index_offset:index_offset + index_size])) if magic == MAGIC else None
+        if index is None or index["pixel_format"] != PIXEL_FORMAT:
+            print(f"Ignoring sprite pack {path}, run bake_sprites.py to make it again")
+            return
+        SpritePack.data = memoryview(data)
+        SpritePack.index = index
+
+    @staticmethod
+    def check_initialized():
+        if not SpritePack.initialized:
+            raise Exception("Must call SpritePack.init() before any other methods.")
+
+    @staticmethod
+    def animation_key(path, sheet_size=(1, 1), frame_count=1, rect=None, reverse_x=False, reverse_y=False,
+                      reverse_animation=False, colorkey=None, scale=1.0, start_frame=0):
+        """ Name of an Animation in the pack. Takes the same arguments as AnimationManager.load. """
+        return repr((path, tuple(sheet_size), frame_count, tuple(rect) if rect else None, bool(reverse_x),
+                     bool(reverse_y), bool(reverse_animation), tuple(colorkey) if colorkey else None,
+                     float(scale), start_frame))
+
+    @staticmethod
+    def is_fresh(path):
+        """ Whether the PNG at path is the one that was baked """
+        if path not in SpritePack.fresh:
+            baked = SpritePack.index["sources"].get(path)
+            SpritePack.fresh[path] = (baked is not None and os.path.exists(path)
+                                      and os.path.getmtime(path) == baked)
+        return SpritePack.fresh[path]
+
+    @staticmethod
+    def surface(entry):
+        offset, width, height, alpha, stored = entry
+        if stored:
+            pixels = memoryview(bytearray(zlib.decompress(SpritePack.data[offset:offset + stored])))
+        else:
+            pixels = SpritePack.data[offset:offset + width * height * 4]
+        if alpha:
+            # Wraps the pixels without copying them
+            return pygame.image.frombuffer(pixels, (width, height), PIXEL_FORMAT)
+        # Surfaces without per pixel alpha can't wrap a buffer in the display's format, so copy
+        # the pixels in. Blitting them stays a plain copy instead of a blend.
+        surface = pygame.Surface((width, height), 0, 32, (0xFF0000, 0xFF00, 0xFF, 0))
+        surface.get_buffer().write(pixels.tobytes())
+        return surface
+
+    @staticmethod
+    def has_image(path):
+        """ Whether image(path) would find the image """
+        SpritePack.check_initialized()
+        return path in SpritePack.index["images"] and SpritePack.is_fresh(path)
+
+    @staticmethod
+    def image(path):
+        """
+        :param path: The path of the image
+        :return: A new surface with the baked image, or None if it isn't in the pack
+        """
+        SpritePack.check_initialized()
+        entry = SpritePack.index["images"].get(path)
+        if entry is None or not SpritePack.is_fresh(path):
+            return None
+        return SpritePack.surface(entry)
+
+    @staticmethod
+    def frames(key):
+        """
+        :param key: The animation's name, from animation_key
+        :return: A list of the animation's frames, or None if it isn't in the pack
+        """
+        SpritePack.check_initialized()
+        entry = SpritePack.index["animations"].get(key)
+        if entry is None or not SpritePack.is_fresh(entry["path"]):
+            return None
+        return [SpritePack.surface(frame) for frame in entry["frames"]]
@@ -0,0 +1,54 @@
+import os
+import pygame
+import pytest
+
+MAGENTA = (255, 0, 255)
+IMAGES = [
+    ("assets/images/reticle.png", None),
+    ("assets/images/muzzle_flash.png", None),
+    ("assets/images/muzzle_flash.png", MAGENTA),
+]
+SOUNDS = ["assets/sounds/die_roll.mp3", "assets/sounds/Laser-Shoot.wav"]
+
+
+@pytest.fixture
+def managers():
+    # Assets are loaded relative to the repository root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from sprite_pack import SpritePack
+    from image_manager import ImageManager
+    from sound_manager import SoundManager
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    # No pack, so every image goes through the loader
+    SpritePack.init("")
+    ImageManager.init()
+    SoundManager.init()
+    return ImageManager, SoundManager
+
+
+def expected_pixels(path, colorkey):
+    from image_manager import ImageManager
+    surface = ImageManager.convert(pygame.image.load(path), colorkey)
+    return surface.get_size(), surface.get_colorkey(), pygame.image.tobytes(surface, "RGBA")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_collect_caches_what_was_submitted(managers, workers):
+    from asset_loader import AssetLoader
+    ImageManager, SoundManager = managers
+    loader = AssetLoader(workers)
+
+    loader.submit(IMAGES, SOUNDS)
+    assert (loader.pool is not None) == (workers > 1)
+    assert len(ImageManager.images) == 0
+    loader.collect()
+
+    assert loader.pool is None
+    for path, colorkey in IMAGES:
+        surface = ImageManager.images[path, colorkey]
+        assert (surface.get_size(), surface.get_colorkey(),
+                pygame.image.tobytes(surface, "RGBA")) == expected_pixels(path, colorkey)
+    for path in SOUNDS:
+        assert SoundManager.sounds[path].get_raw() == pygame.mixer.Sound(path).get_raw()
+        assert path in SoundManager.decode_times
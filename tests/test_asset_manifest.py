@@ -0,0 +1,26 @@
+import os
+
+
+def test_prefetched_manifest_covers_the_game_frame():
+    # Assets are loaded relative to the repository root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from headless import HeadlessGame
+    from asset_manifest import AssetPrefetcher
+    from image_manager import ImageManager
+    from animation_manager import AnimationManager
+    from sound_manager import SoundManager
+    game = HeadlessGame(seed=0)
+    prefetcher = AssetPrefetcher()
+    prefetcher.run()
+    assert prefetcher.error is None
+    images = set(ImageManager.images)
+    animations = set(AnimationManager.animations)
+    sounds = set(SoundManager.sounds)
+
+    frame = game.load()
+    game.step(1/60)
+    frame.draw(game.target)
+
+    assert set(ImageManager.images) - images == set()
+    assert set(AnimationManager.animations) - animations == set()
+    assert set(SoundManager.sounds) - sounds == set()
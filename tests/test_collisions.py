@@ -0,0 +1,112 @@
+import os
+import random
+import pytest
+
+from primitives import Pose
+
+
+@pytest.fixture
+def frame():
+    # Assets are loaded relative to the repository root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from headless import HeadlessGame
+    game = HeadlessGame(seed=0)
+    game.tutorial = True
+    return game.load()
+
+
+def fire(frame, start, end):
+    from projectile import PistolBullet
+    bullet = PistolBullet(start, (1, 0), frame)
+    bullet.previous_position = Pose(start)
+    bullet.position = Pose(end)
+    bullet.previous_z = bullet.z = 0
+    frame.projectiles = [bullet]
+    return bullet
+
+
+class Target:
+    """ Stands in for an enemy, recording what hits it """
+
+    def __init__(self, index, position, radius, hits):
+        self.index = index
+        self.position = Pose(position)
+        self.radius = radius
+        self.hits = hits
+
+    def get_hit_by(self, projectile):
+        self.hits.append((self.index, projectile.index))
+
+
+class Shot:
+    """ Stands in for a projectile moving from start to end in one tick """
+
+    def __init__(self, index, start, end, z, radius):
+        self.index = index
+        self.previous_position = Pose(start)
+        self.position = Pose(end)
+        self.previous_z = self.z = z
+        self.radius = radius
+
+
+def test_bullet_hits_every_enemy_it_overlaps(frame):
+    from enemy import Grunt
+    first = Grunt((1000, 500), frame)
+    second = Grunt((1050, 500), frame)
+    frame.enemies = [first, second]
+    bullet = fire(frame, (1020, 500), (1025, 500))
+
+    frame.check_enemy_and_projectile_collisions()
+
+    assert first.health == 100 - bullet.damage
+    assert second.health == 100 - bullet.damage
+
+
+def test_fast_bullet_hits_enemy_it_passed_over(frame):
+    from enemy import Grunt
+    grunt = Grunt((1100, 500), frame)
+    frame.enemies = [grunt]
+    bullet = fire(frame, (900, 500), (1300, 500))
+
+    frame.check_enemy_and_projectile_collisions()
+
+    assert grunt.health == 100 - bullet.damage
+
+
+def test_fast_bullet_leaving_an_enemy_does_not_hit_it_again(frame):
+    from enemy import Grunt
+    grunt = Grunt((1100, 500), frame)
+    frame.enemies = [grunt]
+    fire(frame, (1100, 500), (1400, 500))
+
+    frame.check_enemy_and_projectile_collisions()
+
+    assert grunt.health == 100
+
+
+def test_slow_projectiles_hit_like_testing_every_pair(frame):
+    rng = random.Random(3)
+    for _ in range(30):
+        hits = []
+        enemies = [Target(index, (rng.uniform(0, 2000), rng.uniform(0, 2000)), rng.choice([30, 75, 150]), hits)
+                   for index in range(rng.randint(0, 30))]
+        projectiles = []
+        for index in range(rng.randint(1, 40)):
+            radius = rng.uniform(5, 30)
+            end = rng.uniform(0, 2000), rng.uniform(0, 2000)
+            # Moving less than any enemy's hit distance, so it can't have jumped over one
+            step = rng.uniform(0, 30 + radius)
+            start = end[0] - step, end[1]
+            projectiles.append(Shot(index, start, end, rng.uniform(-100, 0), radius))
+
+        expected = []
+        for enemy in enemies:
+            for projectile in projectiles:
+                projectile_position = projectile.position + Pose((0, projectile.z))
+                if (enemy.position - projectile_position).magnitude() < enemy.radius + projectile.radius:
+                    expected.append((enemy.index, projectile.index))
+
+        frame.enemies = enemies
+        frame.projectiles = projectiles
+        frame.check_enemy_and_projectile_collisions()
+        assert hits == expected
@@ -0,0 +1,10 @@
+import pytest
+
+from particle import Particle, ParticleSystem
+
+
+def test_plain_particle_is_rejected():
+    particles = ParticleSystem()
+    with pytest.raises(ValueError):
+        particles.append(Particle())
+    assert len(particles) == 0
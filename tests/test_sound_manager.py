@@ -0,0 +1,58 @@
+import gc
+import os
+import pygame
+import pytest
+
+SOUNDS = ["assets/sounds/die_roll.mp3", "assets/sounds/Laser-Shoot.wav", "assets/sounds/Enemy-Damage.mp3"]
+
+
+@pytest.fixture
+def sounds():
+    # Assets are loaded relative to the repository root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from sound_manager import SoundManager
+    pygame.init()
+    # Room for only one of the sounds at a time
+    SoundManager.init(budget=1)
+    return SoundManager
+
+
+def test_forgotten_sound_still_held_is_loaded_again_without_decoding(sounds):
+    held = sounds.load(SOUNDS[0])
+    sounds.load(SOUNDS[1])
+    assert SOUNDS[0] not in sounds.sounds
+
+    misses = sounds.misses
+    assert sounds.load(SOUNDS[0]) is held
+    assert sounds.misses == misses
+
+
+def test_forgotten_sound_nothing_holds_is_freed(sounds):
+    sounds.load(SOUNDS[0])
+    sounds.load(SOUNDS[1])
+    gc.collect()
+
+    misses = sounds.misses
+    sounds.load(SOUNDS[0])
+    assert sounds.misses == misses + 1
+
+
+def test_pinned_sound_is_kept(sounds):
+    pinned = sounds.pin(SOUNDS[0])
+    sounds.load(SOUNDS[1])
+    sounds.load(SOUNDS[2])
+
+    assert sounds.sounds[SOUNDS[0]] is pinned
+    assert SOUNDS[1] not in sounds.sounds
+
+
+def test_unreadable_cached_sound_is_decoded_again(sounds, tmp_path):
+    sounds.init(cache_directory=str(tmp_path))
+    samples = sounds.load(SOUNDS[0]).get_raw()
+    (path,) = tmp_path.iterdir()
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 2)
+
+    sounds.init(cache_directory=str(tmp_path))
+    assert sounds.load(SOUNDS[0]).get_raw() == samples
+    assert sounds.read_cache(SOUNDS[0]).get_raw() == samples
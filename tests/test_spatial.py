@@ -0,0 +1,50 @@
+import math
+import random
+
+from spatial import SpatialHash, overlapping_pairs, segment_hit_time
+
+
+def test_spatial_hash_finds_every_point_in_range():
+    rng = random.Random(1)
+    for _ in range(50):
+        grid = SpatialHash(rng.choice([50, 200]))
+        points = [(rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)) for _ in range(100)]
+        for index, (x, y) in enumerate(points):
+            grid.insert(index, x, y)
+        x, y, radius = rng.uniform(-1000, 1000), rng.uniform(-1000, 1000), rng.uniform(0, 400)
+        found = grid.query(x, y, radius)
+        near = [index for index, (px, py) in enumerate(points) if math.hypot(px - x, py - y) <= radius]
+        assert found == sorted(found)
+        assert set(near) <= set(found)
+
+
+def test_overlapping_pairs_matches_brute_force():
+    rng = random.Random(2)
+    for _ in range(50):
+        intervals = []
+        for _ in range(rng.randint(0, 40)):
+            start = rng.uniform(0, 1000)
+            intervals.append((start, start + rng.uniform(0, 150)))
+        expected = [(i, j) for i in range(len(intervals)) for j in range(i + 1, len(intervals))
+                    if intervals[i][0] <= intervals[j][1] and intervals[j][0] <= intervals[i][1]]
+        assert overlapping_pairs(intervals) == expected
+
+
+def test_segment_hit_time_matches_stepping_along_the_segment():
+    rng = random.Random(3)
+    steps = 2000
+    for _ in range(200):
+        x, y, radius = rng.uniform(-100, 100), rng.uniform(-100, 100), rng.uniform(5, 60)
+        start_x, start_y, end_x, end_y = (rng.uniform(-200, 200) for _ in range(4))
+
+        def distance(through):
+            return math.hypot(start_x + (end_x - start_x)*through - x, start_y + (end_y - start_y)*through - y)
+
+        through = segment_hit_time(x, y, radius, start_x, start_y, end_x, end_y)
+        inside = [step / steps for step in range(steps + 1) if distance(step / steps) < radius]
+        if through is not None:
+            assert 0 <= through <= 1
+            assert distance(through) <= radius + 1e-6
+        if inside:
+            assert through is not None
+            assert inside[0] - 1 / steps <= through <= inside[0]
@@ -0,0 +1,28 @@
+import os
+import pygame
+
+from variant_cache import VariantCache
+
+
+def make():
+    surface = pygame.Surface((8, 4), pygame.SRCALPHA, 32)
+    surface.fill((10, 20, 30, 40))
+    return surface
+
+
+def test_unreadable_variant_is_made_again(tmp_path):
+    VariantCache.init(str(tmp_path))
+    VariantCache.get("test", make, size=(8, 4))
+    (path,) = tmp_path.iterdir()
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 1)
+
+    VariantCache.clear_all()
+    misses = VariantCache.misses
+    surface = VariantCache.get("test", make, size=(8, 4))
+
+    assert VariantCache.misses == misses + 1
+    assert surface.get_at((0, 0)) == (10, 20, 30, 40)
+    VariantCache.clear_all()
+    VariantCache.get("test", make, size=(8, 4))
+    assert VariantCache.misses == misses + 1
@@ -0,0 +1,69 @@
+import pygame
+from collections import OrderedDict
+
+
+class TransformCache:
+    """
+    Static class that hands out rotated and scaled copies of surfaces. Scales and angles are rounded
+    to a fixed step, so things that look the same share one surface instead of transforming a new
+    one every draw. Least recently used entries are dropped once there are more than max_entries.
+
+    Returned surfaces are shared: setting their alpha right before blitting is fine, drawing on them
+    is not.
+    """
+
+    scale_step = 1/32
+    angle_step = 2
+    max_entries = 1024
+    surfaces = OrderedDict()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def init(cls, scale_step=1/32, angle_step=2, max_entries=1024):
+        cls.scale_step = scale_step
+        cls.angle_step = angle_step
+        cls.max_entries = max_entries
+        cls.clear()
+
+    @classmethod
+    def clear(cls):
+        cls.surfaces = OrderedDict()
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def quantize_scale(cls, scale):
+        return round(scale / cls.scale_step) * cls.scale_step
+
+    @classmethod
+    def quantize_angle(cls, angle):
+        return round(angle / cls.angle_step) * cls.angle_step % 360
+
+    @classmethod
+    def get(cls, surface, scale=1.0, angle=0):
+        """
+        Rotates surface by angle degrees counterclockwise, then scales the result by scale.
+        :return: The transformed surface, or surface itself if there is nothing to do
+        """
+        scale = cls.quantize_scale(scale)
+        angle = cls.quantize_angle(angle)
+        if scale == 1 and angle == 0:
+            return surface
+        key = surface, scale, angle
+        if key in cls.surfaces:
+            cls.hits += 1
+            cls.surfaces.move_to_end(key)
+            return cls.surfaces[key]
+
+        cls.misses += 1
+        result = surface
+        if angle:
+            result = pygame.transform.rotate(result, angle)
+        if scale != 1:
+            size = max(0, int(result.get_width() * scale)), max(0, int(result.get_height() * scale))
+            result = pygame.transform.scale(result, size)
+        cls.surfaces[key] = result
+        if len(cls.surfaces) > cls.max_entries:
+            cls.surfaces.popitem(last=False)
+        return result
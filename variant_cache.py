@@ -0,0 +1,140 @@
+import os
+import json
+import struct
+import hashlib
+import pygame
+
+# Size of the JSON description that starts each cached file, before the pixels
+HEADER = struct.Struct("<I")
+
+
+class VariantCache:
+    """
+    Static class that keeps surfaces derived from others, like scaled or flipped images, both in
+    memory and on disk. They are keyed by a hash of what they're made from: the mtimes of the source
+    files and the transform's parameters. So later sessions read the pixels back instead of
+    transforming them again, and editing a source file makes its variants again.
+
+    Returned surfaces are shared, so don't draw on them.
+    """
+
+    initialized = False
+    directory = None
+    surfaces = None
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def init(directory=None):
+        """
+        :param directory: Where to keep variants between sessions. None keeps them in memory only.
+        """
+        VariantCache.initialized = True
+        VariantCache.directory = directory
+        VariantCache.surfaces = {}
+        VariantCache.hits = 0
+        VariantCache.misses = 0
+
+    @staticmethod
+    def check_initialized():
+        if not VariantCache.initialized:
+            raise Exception("Must call VariantCache.init() before any other methods.")
+
+    @staticmethod
+    def clear_all():
+        """
+        Forgets everything in memory. What's on disk stays.
+        """
+        VariantCache.check_initialized()
+        VariantCache.surfaces = {}
+
+    @staticmethod
+    def key(name, sources, params):
+        description = repr((name, sorted(params.items()), [(path, os.path.getmtime(path)) for path in sources]))
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    @staticmethod
+    def get(name, make, sources=(), **params):
+        """
+        Returns a variant, making it only if neither memory nor disk have it.
+        :param name: What kind of variant this is, like "scaled"
+        :param make: Function with no arguments that makes the surface
+        :param sources: Paths of the files the variant is made from
+        :param params: Everything else make depends on
+        :return: The surface. This is likely the same reference others are using, so don't be destructive.
+        """
+        VariantCache.check_initialized()
+        key = VariantCache.key(name, sources, params)
+        if key in VariantCache.surfaces:
+            VariantCache.hits += 1
+            return VariantCache.surfaces[key]
+        surface = VariantCache.read(key)
+        if surface is None:
+            VariantCache.misses += 1
+            surface = make()
+            VariantCache.write(key, surface)
+        else:
+            VariantCache.hits += 1
+        VariantCache.surfaces[key] = surface
+        return surface
+
+    @staticmethod
+    def path(key):
+        return os.path.join(VariantCache.directory, key + ".surf")
+
+    @staticmethod
+    def read(key):
+        """
+        :return: The variant saved on disk, or None if there is none. An unreadable one is deleted,
+            so it's made and saved again.
+        """
+        path = VariantCache.path(key) if VariantCache.directory is not None else None
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            (description_size,) = HEADER.unpack_from(data)
+            description = json.loads(data[HEADER.size:HEADER.size + description_size])
+            surface = pygame.Surface(description["size"], description["flags"], 32, description["masks"])
+            pixels = data[HEADER.size + description_size:]
+            if len(pixels) != surface.get_pitch() * surface.get_height():
+                raise ValueError(f"{len(pixels)} bytes of pixels instead of {surface.get_pitch() * surface.get_height()}")
+            surface.get_buffer().write(pixels)
+            if description["colorkey"] is not None:
+                surface.set_colorkey(description["colorkey"], description["flags"] & pygame.RLEACCEL)
+            if description["alpha"] is not None:
+                surface.set_alpha(description["alpha"])
+        except (OSError, ValueError, KeyError, TypeError, struct.error, pygame.error) as e:
+            print(f"Ignoring unreadable sprite variant {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return surface
+
+    @staticmethod
+    def write(key, surface):
+        """ Saves a variant to disk. Only 32 bit surfaces without padding between rows are saved. """
+        if VariantCache.directory is None:
+            return
+        if surface.get_bitsize() != 32 or surface.get_pitch() != surface.get_width() * 4:
+            return
+        description = json.dumps({
+            "size": surface.get_size(),
+            "flags": surface.get_flags() & (pygame.SRCALPHA | pygame.RLEACCEL),
+            "masks": surface.get_masks(),
+            "colorkey": surface.get_colorkey(),
+            "alpha": surface.get_alpha(),
+        }).encode()
+        try:
+            os.makedirs(VariantCache.directory, exist_ok=True)
+            temporary = VariantCache.path(key) + ".tmp"
+            with open(temporary, "wb") as file:
+                file.write(HEADER.pack(len(description)))
+                file.write(description)
+                file.write(surface.get_buffer().raw)
+            os.replace(temporary, VariantCache.path(key))
+        except OSError as e:
+            print(f"Error saving sprite variant: {e}")
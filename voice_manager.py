@@ -0,0 +1,119 @@
+import pygame
+from sound_manager import SoundManager
+
+# Most voices one sound plays at once, and how important it is, by path. Sounds not listed here
+# use DEFAULT_VOICE. When every channel is busy, a sound takes over the oldest channel playing
+# something less important, or as important; if there is none, it isn't played.
+DEFAULT_VOICE = (4, 1)
+VOICES = {
+    # Boss cues the player reacts to
+    "assets/sounds/Laser-Charge.mp3": (1, 3),
+    "assets/sounds/Laser-Shoot.wav": (1, 3),
+    "assets/sounds/Boss-Death.mp3": (1, 3),
+    "assets/sounds/Player-Death.mp3": (1, 3),
+    "assets/sounds/Taking-Damage.ogg": (1, 2),
+    "assets/sounds/die_roll.mp3": (1, 2),
+    # Weapons
+    "assets/sounds/Pistol_v2.mp3": (2, 1),
+    "assets/sounds/Gatling-Gun-1.mp3": (2, 1),
+    "assets/sounds/Gatling-Gun-2.mp3": (2, 1),
+    "assets/sounds/Gatling-Gun-3.mp3": (2, 1),
+    "assets/sounds/Flame-Burst_v2.ogg": (1, 1),
+    "assets/sounds/Knife-2.mp3": (1, 1),
+    # Things that happen many times at once
+    "assets/sounds/Footstep-1.mp3": (1, 0),
+    "assets/sounds/Footstep-2.mp3": (1, 0),
+    "assets/sounds/Footstep-3.mp3": (1, 0),
+    "assets/sounds/Bread-Hits-Object.mp3": (3, 0),
+    "assets/sounds/Enemy-Damage.mp3": (3, 0),
+    "assets/sounds/Wing-Buzz.mp3": (2, 0),
+}
+
+
+class VoiceManager:
+    """
+    Static class that plays sounds on a fixed set of mixer channels. It caps how many voices each
+    sound plays at once, lets important sounds take channels from less important ones, and plays
+    a sound triggered several times in one frame only once.
+    """
+
+    initialized = False
+    channels = None
+    voices = None
+    played_this_frame = None
+    count = 0
+
+    @staticmethod
+    def init(channel_count=32):
+        VoiceManager.initialized = True
+        pygame.mixer.set_num_channels(channel_count)
+        VoiceManager.channels = [pygame.mixer.Channel(i) for i in range(channel_count)]
+        # What each channel was told to play: (sound, priority, order it started in)
+        VoiceManager.voices = [None] * channel_count
+        VoiceManager.played_this_frame = {}
+        VoiceManager.count = 0
+
+    @staticmethod
+    def check_initialized():
+        if not VoiceManager.initialized:
+            raise Exception("Must call VoiceManager.init() before any other methods.")
+
+    @staticmethod
+    def end_frame():
+        """ Lets sounds played this frame be played again """
+        VoiceManager.check_initialized()
+        VoiceManager.played_this_frame = {}
+
+    @staticmethod
+    def playing(index):
+        """ :return: The voice playing on a channel, or None if it's free or playing something else """
+        voice = VoiceManager.voices[index]
+        channel = VoiceManager.channels[index]
+        if voice is None or not channel.get_busy() or channel.get_sound() is not voice[0]:
+            return None
+        return voice
+
+    @staticmethod
+    def pick_channel(sound, max_voices, priority):
+        """ :return: Index of the channel sound should play on, or None if it shouldn't play """
+        same = [index for index in range(len(VoiceManager.channels))
+                if VoiceManager.playing(index) and VoiceManager.voices[index][0] is sound]
+        if len(same) >= max_voices:
+            return min(same, key=lambda index: VoiceManager.voices[index][2])
+
+        free = [index for index, channel in enumerate(VoiceManager.channels) if not channel.get_busy()]
+        if free:
+            return free[0]
+
+        stealable = [index for index in range(len(VoiceManager.channels))
+                     if VoiceManager.playing(index) and VoiceManager.voices[index][1] <= priority]
+        if not stealable:
+            return None
+        return min(stealable, key=lambda index: VoiceManager.voices[index][1:])
+
+    @staticmethod
+    def play(sound, loops=0):
+        """
+        Plays a sound, unless it's already been played this frame
+        :param sound: A sound from SoundManager
+        :param loops: How many times to repeat it, -1 forever
+        :return: The channel it's playing on, or None if it isn't playing
+        """
+        VoiceManager.check_initialized()
+        if sound is None:
+            return None
+        if sound in VoiceManager.played_this_frame:
+            return VoiceManager.played_this_frame[sound]
+
+        max_voices, priority = VOICES.get(SoundManager.path_of(sound), DEFAULT_VOICE)
+        index = VoiceManager.pick_channel(sound, max_voices, priority)
+        channel = None
+        if index is not None:
+            channel = VoiceManager.channels[index]
+            channel.stop()
+            channel.play(sound, loops)
+            VoiceManager.voices[index] = sound, priority, VoiceManager.count
+            VoiceManager.count += 1
+            SoundManager.touch(sound)
+        VoiceManager.played_this_frame[sound] = channel
+        return channel